@@ -2,261 +2,34 @@
 import streamlit as st
 import google.generativeai as genai
 import pandas as pd
-import json
 import io
-
-# --- Definitive Prompt ---
-# The entire prompt engineering logic is stored in this multi-line string.
-DEFINITIVE_PROMPT = """
-# PROMPT: Generate Expert Candidate Assessment Summary
-
-<persona>
-You are an expert Assessment Analyst and professional writer for a leading leadership development firm. Your writing style is insightful, constructive, neutral, and professional, using American English. You write exclusively in the third person and present tense. You are a master at translating quantitative competency scores into a personalized, qualitative summary that is both encouraging and clear. Your primary goal is to create a seamless, flowing narrative, closely following the style and tone of the provided exemplars. You must avoid jargon, robotic phrasing, and repetitive sentence structures. You will rigorously adhere to the gender-specific pronouns provided in the candidate data.
-</persona>
-
-<context>
-This report summarizes a candidate's performance on a leadership assessment. The assessment measures 8 core competencies grouped as follows. You must never refer to these competency names in your final output.
-
-**Competency Groups:**
-* **Overall Leadership Group (Determines the opening sentence and potential strengths):**
-    * Overall Leadership
-    * Reasoning & Problem Solving
-* **Level-Specific Group (Forms the main body of the summary):**
-    * Drives Results
-    * Leads People
-    * Manages Stakeholders
-    * Thinks Strategically
-    * Solves Challenges
-    * Steers Change
-</context>
-
-<interpretation_rules>
-You must follow these rules with absolute precision.
-
-**PART A: OVERALL LEADERSHIP GROUP INTERPRETATIONS**
-This text is used for the opening sentence and for potential strengths/development areas in the bullet points.
-
-* **Competency: Overall Leadership**
-    * *High (3.5-5.00):* "Demonstrates high potential for growth and success in a more complex role."
-    * *Moderate-High (3.0-3.49):* "Candidate demonstrates above average potential for growth and success in a more complex role."
-    * *Moderate-Low (2.5-2.99):* "Candidate demonstrates average potential for growth and success in a more complex role."
-    * *Low (1.00-2.49):* "Candidate demonstrates low potential for growth and success in a more complex role."
-* **Competency: Reasoning & Problem Solving**
-    * *High (3.5-5.00):* "Candidate demonstrates a higher-than-average reasoning and problem-solving ability as compared to a group of peers."
-    * *Moderate (2.5-3.49):* "Candidate demonstrates an average reasoning and problem-solving ability as compared to a group of peers."
-    * *Low (1.00-2.49):* "Candidate demonstrates a below-average reasoning and problem-solving ability as compared to a group of peers."
-
-**PART B: LEVEL-SPECIFIC GROUP INTERPRETATIONS**
-Use the text corresponding to the candidate's assigned Level: APPLY, SHAPE, or GUIDE.
-
----
-***LEVEL: APPLY***
----
-* **Competency: Drives Results**
-    * *High (3.5-5.00):* "Consistently demonstrates high motivation and initiative to exceed expectations. A strong drive to achieve goals, targets, and results. Seeks fulfillment through impact. High focus on achieving outcomes against set targets and delivers consistent performance to exceed own goals. Shows perseverance and determination to achieve tasks and goals despite challenges."
-    * *Moderate (2.5-3.49):* "Demonstrates motivation and takes initiative occasionally. Demonstrates a drive to achieve goals, but may need support. Interest in making an impact is present but not sustained. Moderate focus on outcomes and performance tracking; may occasionally lack focus. Shows perseverance to achieve tasks but may require support in overcoming setbacks or challenges."
-    * *Low (1.00-2.49):* "Demonstrates limited motivation or initiative; may meet expectations but does not show a consistent drive to exceed them. Fulfillment from work or desire to make an impact is not clearly evident. Low focus on outcomes; may not track performance against goals consistently. There may be a lack of perseverance and problem-solving when faced with setbacks."
-* **Competency: Leads People**
-    * *High (3.5-5.00):* "Consistently takes time to focus on both personal and professional growth - for both self and others. Actively pursues continuous improvement and excellence; shows clear willingness to learn and unlearn. Strong ability to resolve problems with team members proactively and achieve common goals. Makes contributions on a continual basis, creates trust and teamwork."
-    * *Moderate (2.5-3.49):* "Focuses on personal and professional growth and engages in learning activities but may not do so consistently. Moderate openness to learning and unlearning. Cooperates with team members in most situations but may need guidance to work through conflicts. Makes contributions intermittently and may not always address conflicts when they arise."
-    * *Low (1.00-2.49):* "Rarely focuses on personal or professional growth. Engagement in learning is limited and may resist feedback or change. Seldom works collaboratively with team members. Rarely contributes meaningfully and may avoid resolving conflicts, often leaving issues unaddressed."
-* **Competency: Manages Stakeholders**
-    * *High (3.5-5.00):* "Consistently shows capability to lead and inspire others. Displays strong empathy, understanding, and a focus on people. Builds relationships with ease and enjoys social interaction. Strong ability to identify and build relationships and connections. Understands stakeholder needs and mutual interests. Works to build long-term relationships."
-    * *Moderate (2.5-3.49):* "Displays some ability to lead and inspire others. May show empathy and focus on people but not consistently. Builds relationships but may need support. May have only partial understanding of stakeholder needs and mutual interests. Works to build long-term relationships but may be inconsistent."
-    * *Low (1.00-2.49):* "Demonstrates limited capability in leading or inspiring others. Social interaction may be minimal or strained. Struggles to build and maintain relationships. Demonstrates limited understanding of stakeholder needs or interdependencies, and does not work to build long-term relationships."
-* **Competency: Thinks Strategically**
-    * *High (3.5-5.00):* "Approaches work with a strong focus on the bigger picture. Operates independently with minimal guidance. Demonstrates a commercial and strategic mindset, regularly anticipating trends and their impact. Understands potential risks and seeks guidance to address the issues. Strong ability to revise strategies based on team needs while prioritising tasks accordingly in order to meet set deadlines."
-    * *Moderate (2.5-3.49):* "Demonstrates awareness of the bigger picture but may need occasional guidance. Understands strategy in parts but may not consistently anticipate trends or broader implications. Can identify risks with some guidance and seeks input occasionally to address issues. Demonstrates some ability to revise plans but may need reminders to prioritise effectively."
-    * *Low (1.00-2.49):* "Focus tends to be on immediate tasks. Requires frequent guidance. Displays limited awareness of trends or the strategic impact of work. Low ability to align goals with team direction and recognise potential risks. Requires frequent support to address issues and struggles to revise plans independently."
-* **Competency: Solves Challenges**
-    * *High (3.5-5.00):* "Consistently addresses problems and challenges with confidence and resilience. Takes a diligent, practical, and solution-focused approach to solving issues. Will likely remain composed in the face of setbacks and approach problems with a positive “can do” attitude."
-    * *Moderate (2.5-3.49):* "Demonstrates ability to address problems but may need support or time to build confidence and resilience. Attempts a practical approach but not always solution-focused. Moderate ability to identify issues proactively, and takes action when promoted. Sometimes may struggle to remain composed under pressure."
-    * *Low (1.00-2.49):* "Struggles to address problems confidently. May rely heavily on others and may not take a practical or solution-oriented approach. Does not prioritise working with others to solve problems and identify solutions. Struggles to remain composed under pressure or maintain a positive approach."
-* **Competency: Steers Change**
-    * *High (3.5-5.00):* "Thrives in change and complexity in the workplace. Manages new ways of working with adaptability, flexibility, and a decisiveness during uncertainty. Supports implementation of new change initiatives and takes appropriate follow-up action."
-    * *Moderate (2.5-3.49):* "Generally copes with change and can adapt when needed. May need support to remain flexible or decisive in uncertain situations. Operates with a degree of comfort when facts are not fully available and support change initiatives, but follow-up action may be delayed or inconsistent."
-    * *Low (1.00-2.49):* "Struggles with change or uncertainty. May resist new ways of working and has difficulty adapting or deciding in changing circumstances. May be uncomfortable operating when facts are unclear and is unlikely to support change initiatives."
-
----
-***LEVEL: SHAPE***
----
-* **Competency: Drives Results**
-    * *High (3.5-5.00):* "Consistently demonstrates high motivation and initiative to exceed expectations. A strong drive to achieve goals, targets, and results. Seeks fulfillment through impact. Drives a high-performance culture across teams and demonstrates grit and persistence when working toward ambitious targets."
-    * *Moderate (2.5-3.49):* "Demonstrates motivation and takes initiative occasionally. Demonstrates a drive to achieve goals, but may need support. Interest in making an impact is present but not sustained. Moderate ability to articulate performance standards that contribute to achieving organisational goals. Occasionally supports performance across teams and shows persistence when working towards goals."
-    * *Low (1.00-2.49):* "Demonstrates limited motivation or initiative; may meet expectations but does not show a consistent drive to exceed them. Fulfillment from work or desire to make an impact is not clearly evident. Low ability to articulate performance standards that support organisational goals. Needs development in fostering a high-performance culture and in maintaining persistence when faced with challenging goals."
-* **Competency: Leads People**
-    * *High (3.5-5.00):* "Consistently takes time to focus on both personal and professional growth - for both self and others. Actively pursues continuous improvement and excellence; shows clear willingness to learn and unlearn. Strongly supports development of others by identifying and leveraging individual strengths. Advocates for learning and career growth, contributing to a culture of learning and continuous improvement."
-    * *Moderate (2.5-3.49):* "Focuses on personal and professional growth for self and others and engages in learning activities but may not do so consistently. Displays willingness to learn and unlearn. Recognizes others’ development needs and offers support, though may not consistently nurture growth or advocate for talent advancement."
-    * *Low (1.00-2.49):* "Rarely focuses on personal or professional growth- for both self and others. Engagement in learning is limited and may resist feedback or change. Shows minimal interest in developing others or contributing to a learning environment. May neglect or avoid growth conversations."
-* **Competency: Manages Stakeholders**
-    * *High (3.5-5.00):* "Consistently shows capability to lead and inspire others. Displays strong empathy, understanding, and a focus on people. Builds relationships with ease and enjoys social interaction. Demonstrates strong ability to engage key stakeholders, build trust-based relationships, and find synergies for mutual outcomes. Proactively networks and stays connected across internal and external touchpoints."
-    * *Moderate (2.5-3.49):* "Displays some ability to lead and inspire others. May show empathy and focus on people inconsistently. Moderate ability to maintain and build relationships with key stakeholders. Often identifies synergies for positive outcomes. Occasionally proactively networks."
-    * *Low (1.00-2.49):* "Demonstrates limited capability in leading or inspiring others. Social interaction may be minimal or strained. Struggles to build and maintain relationships. Rarely engages with stakeholders and does not leverage relationships for mutual outcomes. Limited presence in networks or cross-functional collaboration."
-* **Competency: Thinks Strategically**
-    * *High (3.5-5.00):* "Approaches work with a strong focus on the bigger picture. Operates independently with minimal guidance. Demonstrates a commercial and strategic mindset, regularly anticipating trends and their impact. Effectively balances short-term goals with long-term organizational value. Translates complex goals into clear team actions and helps others understand broader implications."
-    * *Moderate (2.5-3.49):* "Demonstrates some awareness of the bigger picture but may need occasional guidance. Understands strategy in parts but may not consistently anticipate trends or broader implications. Occasionally translates organisational goals into meaningful actions. Can focus on both immediate and longer-term needs but may favor one over the other."
-    * *Low (1.00-2.49):* "Focus tends to be on immediate tasks. Requires frequent guidance. Displays limited awareness of trends or the strategic impact of work. Needs ongoing guidance to connect work with strategic direction. Struggles to translate organizational priorities into meaningful tasks or influence direction."
-* **Competency: Solves Challenges**
-    * *High (3.5-5.00):* "Consistently addresses problems and challenges with confidence and resilience. Takes a diligent, practical, and solution-focused approach. Comfortable navigating ambiguity and complexity. Makes sound decisions under pressure and thrives in environments with multiple demands."
-    * *Moderate (2.5-3.49):* "Has the ability to address problems but may need time or support to build confidence and resilience. Attempts a practical approach but not always solution-focused. Moderate ability to handle ambiguity and complex environments. Shows some confidence in leading through uncertain environments."
-    * *Low (1.00-2.49):* "Struggles to address problems confidently. May rely heavily on others. Practical or solution-oriented approaches are limited. Avoids complexity and ambiguity. Rarely takes initiative in resolving obstacles."
-* **Competency: Steers Change**
-    * *High (3.5-5.00):* "Thrives in change and complexity. Manages new ways of working with adaptability, flexibility, and decisiveness during change. Plays an active role in transformation initiatives, shows strong resilience, and enables buy-in and alignment from others during change."
-    * *Moderate (2.5-3.49):* "Demonstrates ability to cope with change and can adapt when needed. May need support to remain flexible or decisive in uncertain situations. Contributes to organisational change initiatives, may enable buy-in and shows resilience during challenging times."
-    * *Low (1.00-2.49):* "Struggles with change or uncertainty. May resist new ways of working and has difficulty adapting or deciding in changing circumstances. Rarely contributes to transformation efforts and finds it difficult to stay resilient under shifting demands. Has difficulty enabling buy-in and support."
-
----
-***LEVEL: GUIDE***
----
-* **Competency: Drives Results**
-    * *High (3.5-5.00):* "Consistently demonstrates high motivation and initiative to exceed expectations. A strong drive to achieve goals, targets, and results. Seeks fulfillment through impact. Supports and guides team to deliver goals on time. Recognizes high performance, addresses underperformance, displays grit, and manages resources effectively."
-    * *Moderate (2.5-3.49):* "Demonstrates motivation and takes initiative occasionally. Demonstrates a drive to achieve goals, but may need support. Interest in making an impact is present but not sustained. Supports team delivery but may need prompting. Occasionally recognizes performance and addresses underperformance. Shows some grit and manages resources with support."
-    * *Low (1.00-2.49):* "Demonstrates limited motivation or initiative; may meet expectations but does not show a consistent drive to exceed them. Fulfillment from work or desire to make an impact is not clearly evident. Limited support for team delivery. Rarely recognizes performance or addresses underperformance. Struggles with grit and resource management."
-* **Competency: Leads People**
-    * *High (3.5-5.00):* "Consistently takes time to focus on both personal and professional growth - for both self and others. Actively pursues continuous improvement and excellence; shows clear willingness to learn and unlearn. Coaches key talent with timely, constructive feedback. Builds capability by offering challenging development opportunities."
-    * *Moderate (2.5-3.49):* "Focuses on personal and professional growth for self and others and engages in learning activities but may not do so consistently. Displays willingness to learn and unlearn. Provides feedback and guidance, though not always timely or targeted. Offers some development opportunities, but impact may vary."
-    * *Low (1.00-2.49):* "Rarely focuses on personal or professional growth- for both self and others. Engagement in learning is limited and may resist feedback or change. Rarely provides meaningful feedback or development. Struggles to coach talent or build individual capability."
-* **Competency: Manages Stakeholders**
-    * *High (3.5-5.00):* "Consistently shows capability to lead and inspire others. Displays strong empathy, understanding, and a focus on people. Builds relationships with ease and enjoys social interaction. Builds strong relationships to achieve team goals. Understands stakeholder interests and creates long-term partnerships through relationship-building efforts."
-    * *Moderate (2.5-3.49):* "Displays some ability to lead and inspire others. May show empathy and focus on people inconsistently. Moderate ability to maintain and build relationships with key stakeholders. Builds relationships when needed to meet goals. Some awareness of stakeholder interests. Maintains connections, but may not actively deepen them."
-    * *Low (1.00-2.49):* "Demonstrates limited capability in leading or inspiring others. Social interaction may be minimal or strained. Struggles to build and maintain relationships. Engages with stakeholders minimally. Limited understanding of mutual interests. Rarely invests in building or maintaining long-term relationships."
-* **Competency: Thinks Strategically**
-    * *High (3.5-5.00):* "Approaches work with a strong focus on the bigger picture. Operates independently with minimal guidance. Demonstrates a commercial and strategic mindset, regularly anticipating trends and their impact. Considers both short- and long-term impact of decisions. Translates departmental strategy into clear, meaningful actions for self and others."
-    * *Moderate (2.5-3.49):* "Demonstrates some awareness of the bigger picture but may need occasional guidance. Understands strategy in parts but may not consistently anticipate trends or broader implications. Acknowledges short- and long-term implications, though not always fully. Can link strategy to actions but may need support or clarification."
-    * *Low (1.00-2.49):* "Focus tends to be on immediate tasks. Requires frequent guidance. Displays limited awareness of trends or the strategic impact of work. Focuses mostly on immediate tasks. Limited awareness of broader implications or difficulty turning strategy into clear actions."
-* **Competency: Solves Challenges**
-    * *High (3.5-5.00):* "Consistently addresses problems and challenges with confidence and resilience. Takes a diligent, practical, and solution-focused approach. Manages conflicting departmental and people priorities effectively and consistently weighs them when making decisions."
-    * *Moderate (2.5-3.49):* "Has the ability to address problems but may need time or support to build confidence and resilience. Attempts a practical approach but not always solution-focused. Manages departmental and people priorities but may not always weigh them evenly when making decisions."
-    * *Low (1.00-2.49):* "Struggles to address problems confidently. May rely heavily on others. Practical or solution-oriented approaches are limited. Struggles to manage conflicting priorities and rarely weighs them appropriately when making decisions."
-* **Competency: Steers Change**
-    * *High (3.5-5.00):* "Thrives in change and complexity. Manages new ways of working with adaptability, flexibility, and decisiveness during change. Acts as a role model for positive change, inspiring others and clearly translating the change journey into defined actions."
-    * *Moderate (2.5-3.49):* "Demonstrates ability to cope with change and can adapt when needed. May need support to remain flexible or decisive in uncertain situations. Supports change efforts and sometimes inspires others, but may need help translating the journey into clear actions."
-    * *Low (1.00-2.49):* "Struggles with change or uncertainty. May resist new ways of working and has difficulty adapting or deciding in changing circumstances. Rarely acts as a role model for change and struggles to inspire or define clear actions in the change journey."
-
-**PART C: SUMMARY STRUCTURE AND EXECUTION**
-1.  **Opening Sentence:** Your summary MUST begin with the exact sentence from the 'Overall Leadership' interpretation text (Part A) that corresponds to the candidate's score. Add the candidate's first name to the beginning. The sentence should exactly be based on the score there in cometency: Overall Leadership ther  should be no deviation from this rule.
-* **Competency: Overall Leadership** absoulute rules for opening sentence
-    * *High (3.5-5.00):* "Demonstrates high potential for growth and success in a more complex role."
-    * *Moderate-High (3.0-3.49):* "Candidate demonstrates above average potential for growth and success in a more complex role."
-    * *Moderate-Low (2.5-2.99):* "Candidate demonstrates average potential for growth and success in a more complex role."
-    * *Low (1.00-2.49):* "Candidate demonstrates low potential for growth and success in a more complex role."
-2.  **Main Body Paragraph:** Following the opening, describe the 6 'Level-Specific Group' competencies by internally sorting their scores in descending order and weaving their corresponding interpretation texts from Part B into a natural paragraph, mirroring the style of the exemplars. DO NOT name the competencies.
-3.  **Bullet Points:** Provide two strengths and two development areas based on the highest and lowest scores. The bullet points MUST NOT repeat sentences from the main summary. They must be complementary, behavioral statements derived from the interpretation text, as shown in the exemplars.
-
-</interpretation_rules>
-
-<exemplars>
-Here are four golden standard examples. Study them carefully to understand the expected narrative style, tone, and structure, and how to adapt the summary for different lengths.
-
-**--- EXAMPLE 1 ---**
-<candidate_data>
-* Name: Sub 1
-* Gender (for pronouns): She/Her
-* Level: Apply
-* Scores:
-    * Overall Leadership: 4
-    * Reasoning & Problem Solving: 4
-    * Drives Results: 4
-    * Leads People: 3
-    * Manages Stakeholder: 4
-    * Thinks Strategically: 4
-    * Solves Challenges: 5
-    * Steers Change: 4
-</candidate_data>
-<sme_written_output>
-{
-  "summary_200": "Sub 1 demonstrates high potential for growth and success in a more complex role. She demonstrates high motivation to exceed expectations and strong drive to achieve goals. She shows a strong capability to lead and inspire others, building relationships with ease and enjoying social interactions. She has strong focus on the bigger picture, thrives in change and complexity, and consistently addresses problems with confidence and resilience. While she focuses on personal and professional growth and engages in learning activities, she may not do so consistently and may need guidance to work through conflicts.\\n\\n**Strengths:**\\n* Takes a diligent, practical, and solution-focused approach to solving issues.\\n* Will likely remain composed in the face of setbacks and approach problems with a positive attitude.\\n\\n**Development Areas:**\\n* Could benefit from developing a greater openness to learning and unlearning.\\n* May benefit from ensuring conflicts are addressed when they arise.",
-  "summary_150": "Sub 1 demonstrates high potential for growth and success. With high motivation and a strong drive for results, she capably leads and inspires others while building relationships with ease. She maintains a strong focus on the bigger picture, thrives in complexity, and addresses challenges with confidence. Her main area for development is to apply that same consistency to her personal growth and in proactively resolving team conflicts.\\n\\n**Strengths:**\\n* Takes a diligent, practical, and solution-focused approach to solving issues.\\n* Remains composed in the face of setbacks and approaches problems with a positive attitude.\\n\\n**Development Areas:**\\n* Could benefit from developing a greater openness to learning and unlearning.\\n* May benefit from ensuring conflicts are addressed when they arise."
-}
-</sme_written_output>
-
-**--- EXAMPLE 2 ---**
-<candidate_data>
-* Name: John Doe
-* Gender (for pronouns): He/Him
-* Level: Apply
-* Scores:
-    * Overall Leadership: 3
-    * Reasoning & Problem Solving: 3
-    * Drives Results: 2
-    * Leads People: 2
-    * Manages Stakeholder: 3
-    * Thinks Strategically: 3
-    * Solves Challenges: 3
-    * Steers Change: 3
-</candidate_data>
-<sme_written_output>
-{
-  "summary_200": "John Doe demonstrates moderate potential for growth and success in a more complex role. He may not show a consistent drive to exceed expectations. Engagement in learning is limited and he may resist feedback or change. He displays some ability to build relationships, and address problems, though he may need support or time to build confidence. While he demonstrates awareness of the bigger picture, he may need occasional guidance. He generally copes with change and can adapt when needed.\\n\\n**Strengths:**\\n* Works to build long-term relationships and shows some understanding of stakeholder needs.\\n* Operates with a degree of comfort when facts are not fully available and supports change initiatives.\\n\\n**Development Areas:**\\n* Could benefit from developing greater perseverance when faced with setbacks and a stronger focus on tracking outcomes against goals.\\n* Could focus on working more collaboratively with team members and proactively contributing to resolving conflicts.",
-  "summary_150": "John Doe demonstrates moderate potential for growth and success. While he can adapt to change and shows an awareness of the bigger picture, he may require guidance. He displays some ability to build relationships and address problems but would benefit from building more confidence. His key development areas are increasing his consistent drive to exceed expectations and being more proactive in his engagement with learning and feedback.\\n\\n**Strengths:**\\n* Works to build long-term relationships with some understanding of stakeholder needs.\\n* Operates with a degree of comfort when facts are not fully available.\\n\\n**Development Areas:**\\n* Could benefit from greater perseverance and a stronger focus on tracking outcomes against goals.\\n* Could focus on working more collaboratively and proactively resolving conflicts."
-}
-</sme_written_output>
-
-**--- EXAMPLE 3 ---**
-<candidate_data>
-* Name: Ayesha Obaid Al Mheiri
-* Gender (for pronouns): She/Her
-* Level: Shape
-* Scores:
-    * Overall Leadership: 2.97
-    * Reasoning & Problem Solving: 3
-    * Drives Results: 2.97
-    * Leads People: 3.15
-    * Manages Stakeholder: 2.92
-    * Thinks Strategically: 3.38
-    * Solves Challenges: 3.92
-    * Steers Change: 2.89
-</candidate_data>
-<sme_written_output>
-{
-  "summary_200": "Ayesha Obaid Al Mheiri demonstrates moderate potential for growth and success in a more complex role. She occasionally takes initiatives and demonstrates motivation. She focuses on personal and professional growth but may not do so consistently. Ayesha displays the ability to lead and inspire others and build and maintain relationships. She shows awareness of the bigger picture but may need occasional guidance to translate broader goals into action. She addresses problems with confidence, applies a practical and solution-focused approach, and handles ambiguity well. She generally adapts to change when needed, though may require support to remain flexible or decisive in uncertain situations.\\n\\n**Strengths:**\\n* Consistently addresses problems and challenges with confidence and resilience.\\n* Occasionally translates organisational goals into meaningful actions.\\n\\n**Development Areas:**\\n* May need support to remain flexible or decisive in uncertain situations.\\n* May show empathy and focus on people inconsistently.",
-  "summary_150": "Ayesha Obaid Al Mheiri demonstrates moderate potential for growth. She shows awareness of the bigger picture and confidently addresses problems with a solution-focused approach. She can lead and adapt to change, though may need support to remain decisive in uncertain situations. Her development would be enhanced by a more consistent focus on her personal growth and in demonstrating empathy when managing stakeholder relationships.\\n\\n**Strengths:**\\n* Consistently addresses problems and challenges with confidence and resilience.\\n* Occasionally translates organizational goals into meaningful actions.\\n\\n**Development Areas:**\\n* May need support to remain flexible or decisive in uncertain situations.\\n* May show empathy and focus on people inconsistently."
-}
-</sme_written_output>
-
-**--- EXAMPLE 4 ---**
-<candidate_data>
-* Name: Ali Salem Al Suwaidi
-* Gender (for pronouns): He/Him
-* Level: Apply
-* Scores:
-    * Overall Leadership: 2.55
-    * Reasoning & Problem Solving: 3
-    * Drives Results: 2.22
-    * Leads People: 2.55
-    * Manages Stakeholder: 2.36
-    * Thinks Strategically: 2.47
-    * Solves Challenges: 5
-    * Steers Change: 1.43
-</candidate_data>
-<sme_written_output>
-{
-  "summary_200": "Ali Salem Al Suwaidi demonstrates moderate potential for growth and success in a more complex role. He may meet expectations but has limited drive to exceed them. Fulfillment from work or a desire to make an impact is limited. He focuses on personal and professional growth but may not do so consistently. He demonstrates limited capability to lead and inspire others and struggles to build relationships. His focus tends to be on immediate tasks, he struggles to address problems, may not take a solution-oriented approach and may rely heavily on others. However, he generally copes with change and can adapt when needed.\\n\\n**Strengths:**\\n* Supports change initiatives and operate with comfort during uncertainty.\\n* Focuses on personal and professional growth and engages in learning activities, though this may be inconsistent.\\n\\n**Development Areas:**\\n* Enhance independent problem-solving and decision-making confidence.\\n* Increase motivation, initiative, and perseverance in setbacks.",
-  "summary_150": "Ali Salem Al Suwaidi demonstrates moderate potential for growth. While he can cope with change when needed, his focus tends to remain on immediate tasks. He may meet expectations but shows a limited drive to exceed them and struggles to build relationships. He would benefit from developing more confidence and taking a more solution-oriented approach when addressing problems. His focus on personal growth is a good foundation to build upon.\\n\\n**Strengths:**\\n* Supports change initiatives and can operate with comfort during uncertainty.\\n* Focuses on personal and professional growth, though this may be inconsistent.\\n\\n**Development Areas:**\\n* Enhance independent problem-solving and decision-making confidence.\\n* Increase motivation, initiative, and perseverance in setbacks."
-}
-</sme_written_output>
-</exemplars>
-
-<task>
-Analyze the following candidate data. Based on all the rules, context, and exemplars provided, generate a personalized assessment summary.
-
-**Candidate Data:**
-* **Name:** [Candidate Name]
-* **Gender (for pronouns):** [He/Him, She/Her, They/Them]
-* **Level:** [Apply/Shape/Guide]
-* **Scores:**
-    * Overall Leadership: [Score]
-    * Reasoning & Problem Solving: [Score]
-    * Drives Results: [Score]
-    * Leads People: [Score]
-    * Manages Stakeholders: [Score]
-    * Thinks Strategically: [Score]
-    * Solves Challenges: [Score]
-    * Steers Change: [Score]
-
-Your final output must be a single, raw JSON object with three keys: "summary_200", "summary_150", and "summary_100". The value for each key will be the complete summary (paragraph and bullet points) at that approximate word count. Do not include any other text, explanation, or markdown formatting like ```json outside of this JSON object.
-</task>
-"""
+import time
+import uuid
+
+from backends import GeminiBackend
+from cache import SummaryCache
+from checkpoint import RunCheckpoint, upload_hash
+from core import (
+    FAILURE_COLUMN,
+    MODE_FULL,
+    MODE_RESOLVED,
+    MODE_SIGNATURE,
+    MODE_TEMPLATE,
+    SAMPLE_CANDIDATES,
+    SUMMARY_COLUMNS,
+    build_results_df,
+    failed_positions,
+    generate_rows,
+    group_by_signature,
+    prepare_rows,
+    signature_report,
+)
+from engine import RateLimiter
+from jobs import FINISHED_STATUSES, STATUS_DONE, STATUS_QUEUED, JobRunner, JobStore, results_frame
+from metrics import RunMetrics
+from preflight import validate_cohort
+from resilience import CircuitBreaker, ResilientModel, RetryPolicy, make_hedge_policy
+from streaming import dataframe_to_xlsx_bytes, read_upload
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -268,25 +41,38 @@ st.set_page_config(
 # --- App State Management ---
 if 'processed_data' not in st.session_state:
     st.session_state.processed_data = None
+if 'run_metrics' not in st.session_state:
+    st.session_state.run_metrics = None
+if 'results_version' not in st.session_state:
+    st.session_state.results_version = None
+if 'results_export' not in st.session_state:
+    st.session_state.results_export = None
+if 'results_hash' not in st.session_state:
+    st.session_state.results_hash = None
+# Background jobs belong to an owner id kept in the URL, so a refreshed or
+# reopened tab still finds them.
+if 'owner' not in st.query_params:
+    st.query_params['owner'] = uuid.uuid4().hex[:12]
+job_owner = st.query_params['owner']
+
+GENERATION_MODE_LABELS = {
+    "Full prompt": MODE_FULL,
+    "Pre-resolved interpretations": MODE_RESOLVED,
+    "Shared band profiles": MODE_SIGNATURE,
+    "Template only (offline)": MODE_TEMPLATE,
+}
+LIVE_TABLE_REFRESH_SECONDS = 1.0
+JOB_POLL_SECONDS = 2
+# Server-wide quota shared by all background jobs (one API key).
+JOB_REQUESTS_PER_MINUTE = 60
+JOB_TOKENS_PER_MINUTE = 0
 
 # --- Helper Functions ---
 
+@st.cache_data
 def create_sample_excel():
     """Creates an in-memory sample Excel file for users to download."""
-    sample_data = {
-        'Name': ['Jane Doe', 'John Smith'],
-        'Gender': ['She/Her', 'He/Him'],
-        'Level': ['Apply', 'Shape'],
-        'Overall Leadership': [4.1, 2.8],
-        'Reasoning & Problem Solving': [3.5, 3.1],
-        'Drives Results': [4.5, 2.5],
-        'Leads People': [3.9, 3.2],
-        'Manages Stakeholders': [4.2, 2.9],
-        'Thinks Strategically': [3.8, 3.4],
-        'Solves Challenges': [4.0, 3.8],
-        'Steers Change': [3.7, 2.7]
-    }
-    df = pd.DataFrame(sample_data)
+    df = pd.DataFrame(SAMPLE_CANDIDATES)
     
     output = io.BytesIO()
     with pd.ExcelWriter(output, engine='openpyxl') as writer:
@@ -294,65 +80,51 @@ def create_sample_excel():
     processed_data = output.getvalue()
     return processed_data
 
-def generate_summaries_for_candidate(row, model):
-    """Constructs the prompt and calls the Gemini API for a single candidate."""
-    try:
-        task_prompt = f"""
-<task>
-Analyze the following candidate data. Based on all the rules, context, and exemplars provided, generate a personalized assessment summary.
-
-**Candidate Data:**
-* **Name:** {row['Name']}
-* **Gender (for pronouns):** {row['Gender']}
-* **Level:** {row['Level']}
-* **Scores:**
-    * Overall Leadership: {row['Overall Leadership']}
-    * Reasoning & Problem Solving: {row['Reasoning & Problem Solving']}
-    * Drives Results: {row['Drives Results']}
-    * Leads People: {row['Leads People']}
-    * Manages Stakeholders: {row['Manages Stakeholders']}
-    * Thinks Strategically: {row['Thinks Strategically']}
-    * Solves Challenges: {row['Solves Challenges']}
-    * Steers Change: {row['Steers Change']}
-
-Your final output must be a single, raw JSON object with three keys: "summary_200", "summary_150", and "summary_100". The value for each key will be the complete summary (paragraph and bullet points) at that approximate word count. Do not include any other text, explanation, or markdown formatting like ```json outside of this JSON object.
-</task>
-"""
-        
-        final_prompt = DEFINITIVE_PROMPT.replace(
-            """<task>
-Analyze the following candidate data. Based on all the rules, context, and exemplars provided, generate a personalized assessment summary.
-
-**Candidate Data:**
-* **Name:** [Candidate Name]
-* **Gender (for pronouns):** [He/Him, She/Her, They/Them]
-* **Level:** [Apply/Shape/Guide]
-* **Scores:**
-    * Overall Leadership: [Score]
-    * Reasoning & Problem Solving: [Score]
-    * Drives Results: [Score]
-    * Leads People: [Score]
-    * Manages Stakeholders: [Score]
-    * Thinks Strategically: [Score]
-    * Solves Challenges: [Score]
-    * Steers Change: [Score]
-
-Your final output must be a single, raw JSON object with three keys: "summary_200", "summary_150", and "summary_100". The value for each key will be the complete summary (paragraph and bullet points) at that approximate word count. Do not include any other text, explanation, or markdown formatting like ```json outside of this JSON object.
-</task>""",
-            task_prompt
-        )
-
-        response = model.generate_content(final_prompt)
-        
-        cleaned_response = response.text.strip().lstrip("```json").rstrip("```").strip()
-        
-        summaries = json.loads(cleaned_response)
-        return summaries.get('summary_200', 'Error'), summaries.get('summary_150', 'Error'), summaries.get('summary_100', 'Error')
-
-    except Exception as e:
-        error_message = f"Failed to process {row.get('Name', 'Unknown Candidate')}. Error: {str(e)}. Raw Response: {response.text if 'response' in locals() else 'N/A'}"
-        st.warning(error_message)
-        return "Error", "Error", "Error"
+@st.cache_data(max_entries=8, show_spinner="Reading uploaded file...")
+def parse_upload(content_hash, file_name, _content):
+    """Parses an uploaded .xlsx, .csv or .parquet file once per distinct content.
+
+    Only `content_hash` and `file_name` are part of the cache key; the raw
+    bytes are passed alongside (underscore-prefixed, so Streamlit does not
+    hash them again).
+    """
+    return read_upload(file_name, _content)
+
+@st.cache_data(max_entries=8)
+def check_upload(content_hash, _df):
+    """Pre-flight validation of a parsed upload, once per distinct content."""
+    return validate_cohort(_df)
+
+@st.cache_resource
+def get_model():
+    """The Gemini backend of this server process, so its registered prompt prefixes survive reruns."""
+    return GeminiBackend('gemini-2.5-pro')
+
+@st.cache_resource
+def get_job_runner(_model):
+    """The one JobRunner of this server process, shared by every session."""
+    return JobRunner(JobStore(), model=_model,
+                     rate_limiter=RateLimiter(JOB_REQUESTS_PER_MINUTE, JOB_TOKENS_PER_MINUTE),
+                     breaker=CircuitBreaker()).start()
+
+def set_results(results_df, source_hash=None):
+    """Stores new results and gives them a fresh version so the export is rebuilt.
+
+    `source_hash` is the upload hash the results were generated from; only
+    results of the current upload offer re-running their failed rows.
+    """
+    st.session_state.processed_data = results_df
+    st.session_state.results_hash = None if results_df is None else source_hash
+    st.session_state.results_version = None if results_df is None else uuid.uuid4().hex
+
+def results_excel_bytes():
+    """The results workbook, built only when the results version changes."""
+    version = st.session_state.results_version
+    export = st.session_state.results_export
+    if export is None or export[0] != version:
+        export = (version, dataframe_to_xlsx_bytes(st.session_state.processed_data, sheet_name='Generated_Summaries'))
+        st.session_state.results_export = export
+    return export[1]
 
 # --- Main App UI ---
 
@@ -363,11 +135,13 @@ st.markdown("This application uses **Gemini 2.5 Pro** to transform quantitative
 try:
     api_key = st.secrets["GOOGLE_API_KEY"]
     genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-2.5-pro')
+    model = get_model()
     st.sidebar.success("API Key loaded successfully!", icon="✅")
-except Exception as e:
-    st.error("🚨 Google API Key not found or invalid in secrets.toml. Please ensure it is set up correctly for deployment.")
-    st.stop()
+except Exception:
+    model = None
+    st.error("🚨 Google API Key not found or invalid in secrets.toml. Please ensure it is set up correctly for deployment. Only the offline template mode is available.")
+
+job_runner = get_job_runner(model)
 
 # --- Sidebar for Instructions and File Download ---
 with st.sidebar:
@@ -388,40 +162,200 @@ with st.sidebar:
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
 
+    st.header("Processing Settings")
+    generation_mode_label = st.radio(
+        "Generation mode",
+        list(GENERATION_MODE_LABELS),
+        help="Pre-resolved mode computes score bands and ordering locally and sends only the selected "
+             "interpretation texts. Shared band profiles mode makes one pre-resolved request per group of candidates "
+             "with the same Level, bands, ordering and pronouns, then fills in each name locally. Template mode "
+             "builds summaries directly from those texts with no API call.",
+    )
+    generation_mode = GENERATION_MODE_LABELS[generation_mode_label]
+    max_workers = st.slider("Concurrent requests", min_value=1, max_value=16, value=4,
+                            help="How many candidates are sent to the API at the same time.")
+    batch_size = st.number_input("Candidates per request", min_value=1, max_value=20, value=1,
+                                 help="Values above 1 send several candidates in one request to save prompt tokens.")
+    requests_per_minute = st.number_input("Requests per minute (0 = unlimited)", min_value=0, value=60, step=10,
+                                          help="Applies to runs in this session; background jobs share one server-wide limit.")
+    tokens_per_minute = st.number_input("Tokens per minute (0 = unlimited)", min_value=0, value=0, step=10000,
+                                        help="Applies to runs in this session; background jobs share one server-wide limit.")
+    max_attempts = st.number_input("Max attempts per request", min_value=1, max_value=8, value=4,
+                                   help="Rate-limit, overload and timeout errors are retried with jittered exponential backoff.")
+    call_deadline = st.number_input("Per-call deadline in seconds (0 = none)", min_value=0, value=300, step=30,
+                                    help="A request with no answer by then is abandoned and retried as a timeout.")
+    hedge_requests = st.checkbox("Hedge slow requests", value=False,
+                                 help="Sends a duplicate of a request that is slower than most recent ones and "
+                                      "keeps whichever answers first.")
+    hedge_percentile = st.slider("Hedge after latency percentile", min_value=50, max_value=99, value=95,
+                                 disabled=not hedge_requests)
+    hedge_budget = st.slider("Max extra requests from hedging (%)", min_value=1, max_value=50, value=10,
+                             disabled=not hedge_requests)
+    run_in_background = st.checkbox("Run as background job", value=True,
+                                    help="Queues the run on the server so it keeps going if you close the tab. "
+                                         "Results can be downloaded later by job id.")
+
+    st.header("Response Cache")
+    bypass_cache = st.checkbox("Bypass cache (always call the API)", value=False,
+                               help="Fresh results are still written to the cache.")
+    if st.button("🗑️ Clear cache", help="Use after editing the prompt to drop every stored summary."):
+        SummaryCache().clear()
+        st.success("Cache cleared.")
+
+# --- Generation Run ---
+
+def run_generation(df, positions, summaries_by_row, failures_by_row, checkpoint):
+    """Generates the given row positions of `df` with the sidebar settings.
+
+    Fills `summaries_by_row` / `failures_by_row` as rows complete, appends
+    successes to the checkpoint and keeps a live results table updated.
+    Returns (results, cache, client) for reporting; the run's metrics are
+    kept in the session for the sidebar panel.
+    """
+    progress_bar = st.progress(0, text="Initializing...")
+    live_table = st.empty()
+
+    all_rows = prepare_rows(df, generation_mode)
+    rows = [all_rows[position] for position in positions]
+    cache = SummaryCache(bypass=bypass_cache)
+    metrics = RunMetrics(getattr(model, 'model_name', None))
+    client = ResilientModel(model, rate_limiter=RateLimiter(requests_per_minute, tokens_per_minute),
+                            retry_policy=RetryPolicy(max_attempts=max_attempts), breaker=CircuitBreaker(),
+                            metrics=metrics,
+                            hedge_policy=make_hedge_policy(hedge_percentile if hedge_requests else None,
+                                                           call_deadline, hedge_budget / 100),
+                            max_workers=max_workers)
+    last_refresh = [0.0]
+
+    def update_progress(completed, total, result):
+        position = positions[result.position]
+        summaries_by_row[position] = result.summaries
+        if result.error:
+            failures_by_row[position] = result.failure
+        else:
+            failures_by_row.pop(position, None)
+            checkpoint.append(position, result.summaries)
+        progress_text = f"Completed {completed}/{total}: {rows[result.position]['Name']}..."
+        progress_bar.progress(completed / total, text=progress_text)
+        if time.monotonic() - last_refresh[0] >= LIVE_TABLE_REFRESH_SECONDS or completed == total:
+            live_table.dataframe(build_results_df(df, summaries_by_row, failures_by_row))
+            last_refresh[0] = time.monotonic()
+
+    results = generate_rows(rows, model=client, mode=generation_mode, batch_size=batch_size,
+                            max_workers=max_workers, cache=cache, on_result=update_progress, metrics=metrics)
+    metrics.finish()
+    st.session_state.run_metrics = metrics
+    progress_bar.empty()
+    live_table.empty()
+    if generation_mode == MODE_SIGNATURE:
+        report = signature_report(group_by_signature(rows))
+        st.caption(f"Band-profile sharing: {report['groups']} groups for {report['rows']} candidates "
+                   f"({report['calls_saved']} calls saved, {report['savings_pct']}%; "
+                   f"largest group {report['largest_group']}).")
+    return results, cache, client
+
 # --- File Uploader and Processing Logic ---
-uploaded_file = st.file_uploader("📂 Upload Your Candidate Data Excel File", type=["xlsx"])
+uploaded_file = st.file_uploader("📂 Upload Your Candidate Data Excel File", type=["xlsx", "csv", "parquet"])
 
 if uploaded_file:
     try:
-        df = pd.read_excel(uploaded_file)
+        file_bytes = uploaded_file.getvalue()
+        file_hash = upload_hash(file_bytes)
+        df = parse_upload(file_hash, uploaded_file.name, file_bytes)
         st.info(f"File '{uploaded_file.name}' uploaded successfully. Found {len(df)} candidates.")
         
         with st.expander("View Uploaded Data"):
             st.dataframe(df)
 
-        if st.button("🚀 Generate All Summaries", type="primary"):
-            st.session_state.processed_data = None
-            progress_bar = st.progress(0, text="Initializing...")
+        preflight = check_upload(file_hash, df)
+        if preflight.missing_columns:
+            st.error(f"The file is missing required columns: {', '.join(preflight.missing_columns)}. "
+                     "Download the template from the sidebar for the expected layout.")
+            st.stop()
+        if preflight.invalid_count:
+            st.warning(f"{preflight.invalid_count} of {len(df)} rows failed validation and will be skipped; "
+                       f"only the {len(df) - preflight.invalid_count} valid rows are sent for generation.")
+            with st.expander("Validation report"):
+                error_report = preflight.error_report()
+                st.dataframe(error_report)
+                st.download_button("📥 Download validation report (CSV)", data=error_report.to_csv(index=False),
+                                   file_name="validation_report.csv", mime="text/csv")
+        df = preflight.cleaned
+        runnable = set(preflight.valid_positions)
+        invalid_failures = preflight.failures()
+
+        checkpoint = RunCheckpoint(file_hash)
+        completed_rows = checkpoint.load()
+        resume_clicked = False
+        if completed_rows:
+            st.info(f"{len(completed_rows)} of {len(df)} candidates already have saved results from an earlier run of this file.")
+            resume_col, discard_col = st.columns(2)
+            resume_clicked = resume_col.button("▶️ Resume (only rows without results)")
+            if discard_col.button("🧹 Discard saved results"):
+                checkpoint.clear()
+                completed_rows = {}
+                set_results(None)
+
+        processed = st.session_state.processed_data
+        failed = [
+            position for position in failed_positions(processed) if position in runnable
+        ] if processed is not None and st.session_state.results_hash == file_hash else []
+        rerun_clicked = False
+        if failed:
+            rerun_clicked = st.button(f"🔁 Re-run {len(failed)} failed rows only")
+
+        generate_clicked = st.button("🚀 Generate All Summaries", type="primary")
+        if (generate_clicked or resume_clicked or rerun_clicked) and model is None and generation_mode != MODE_TEMPLATE:
+            st.error("An API key is required for this generation mode.")
+            st.stop()
+        if generate_clicked and run_in_background:
+            job_id = job_runner.store.submit(job_owner, uploaded_file.name, file_bytes, len(runnable), settings={
+                'mode': generation_mode,
+                'batch_size': int(batch_size),
+                'max_workers': int(max_workers),
+                'max_attempts': int(max_attempts),
+                'bypass_cache': bypass_cache,
+                'deadline': int(call_deadline),
+                'hedge_percentile': hedge_percentile if hedge_requests else None,
+                'hedge_budget': hedge_budget / 100,
+            })
+            job_runner.notify()
+            st.success(f"Queued as job `{job_id}`. Follow its progress under 'Background Jobs' below.")
+        elif generate_clicked or resume_clicked or rerun_clicked:
+            if generate_clicked:
+                checkpoint.clear()
+                completed_rows = {}
+            if rerun_clicked:
+                summaries_by_row = {
+                    position: tuple(processed.loc[position, SUMMARY_COLUMNS])
+                    for position in runnable if position not in failed
+                }
+                positions = failed
+            else:
+                summaries_by_row = dict(completed_rows)
+                positions = [position for position in sorted(runnable) if position not in completed_rows]
+            set_results(None)
+
+            failures_by_row = dict(invalid_failures)
+            results, cache, client = run_generation(df, positions, summaries_by_row, failures_by_row, checkpoint)
+            for result in results:
+                if result.error:
+                    st.warning(result.error)
             
-            results_list = []
-            total_rows = len(df)
-
-            for index, row in df.iterrows():
-                progress_text = f"Processing candidate {index + 1}/{total_rows}: {row['Name']}..."
-                progress_bar.progress((index + 1) / total_rows, text=progress_text)
-                
-                summaries = generate_summaries_for_candidate(row, model)
-                results_list.append(summaries)
+            set_results(build_results_df(df, summaries_by_row, failures_by_row), file_hash)
             
-            progress_bar.empty()
-            
-            results_df = pd.DataFrame(results_list, columns=['Summary (200 words)', 'Summary (150 words)', 'Summary (100 words)'])
-            
-            final_df = pd.concat([df, results_df], axis=1)
-            st.session_state.processed_data = final_df
-            
-            st.balloons()
-            st.success("🎉 All summaries generated successfully!")
+            if len(failures_by_row) > len(invalid_failures):
+                st.warning(f"{len(failures_by_row) - len(invalid_failures)} rows failed. See the '{FAILURE_COLUMN}' column and use 'Re-run failed rows only'.")
+            else:
+                st.balloons()
+                st.success("🎉 All summaries generated successfully!")
+            st.caption(f"Cache: {cache.hits} hits, {cache.misses} misses "
+                       f"({cache.misses} API calls needed for {len(positions)} candidates). "
+                       f"{len(runnable) - len(positions)} rows were kept from earlier results. "
+                       f"Retries: {client.retries}; circuit breaker pauses: {client.breaker.trips}.")
+        elif completed_rows and st.session_state.processed_data is None:
+            # After a refresh or rerun, show what the checkpoint already holds.
+            set_results(build_results_df(df, completed_rows, invalid_failures), file_hash)
 
     except Exception as e:
         st.error(f"An error occurred while processing the file: {e}")
@@ -431,13 +365,84 @@ if st.session_state.processed_data is not None:
     st.header("Generated Summaries")
     st.dataframe(st.session_state.processed_data)
     
-    output_excel = io.BytesIO()
-    with pd.ExcelWriter(output_excel, engine='openpyxl') as writer:
-        st.session_state.processed_data.to_excel(writer, index=False, sheet_name='Generated_Summaries')
-    
     st.download_button(
         label="✅ Download Results as Excel",
-        data=output_excel.getvalue(),
+        data=results_excel_bytes(),
         file_name='candidate_summaries_output.xlsx',
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
+
+# --- Background Jobs ---
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def show_jobs():
+    """Polls this owner's jobs; finished ones can be downloaded or opened below."""
+    store = job_runner.store
+    jobs = store.list_jobs(owner=job_owner)
+    if not jobs:
+        st.caption("No background jobs yet.")
+    for job in jobs:
+        label = f"`{job['id']}` · {job['file_name']} · {job['settings']['mode']} · {job['status']}"
+        if job['status'] == STATUS_QUEUED:
+            st.write(f"{label} (position {store.queue_position(job['id']) + 1} in queue)")
+            continue
+        st.progress(job['completed'] / job['total'] if job['total'] else 1.0,
+                    text=f"{label}: {job['completed']}/{job['total']} rows, {job['failed']} failed")
+        if job['error']:
+            st.error(job['error'])
+        if job['status'] == STATUS_DONE:
+            download_col, open_col = st.columns(2)
+            download_col.download_button("📥 Download results", data=store.results(job['id']),
+                                         file_name=f"summaries_{job['id']}.xlsx", key=f"download_{job['id']}",
+                                         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+            if open_col.button("📄 Show results", key=f"open_{job['id']}"):
+                set_results(results_frame(store.results(job['id'])))
+                st.rerun()
+
+st.header("Background Jobs")
+show_jobs()
+with st.expander("Find a job by id"):
+    lookup_id = st.text_input("Job id").strip()
+    if lookup_id:
+        job = job_runner.store.get(lookup_id)
+        if job is None:
+            st.error(f"No job with id `{lookup_id}`.")
+        elif job['status'] not in FINISHED_STATUSES:
+            st.info(f"Job `{lookup_id}` is {job['status']}: {job['completed']}/{job['total']} rows done.")
+        elif job['status'] == STATUS_DONE:
+            st.download_button("📥 Download results", data=job_runner.store.results(lookup_id),
+                               file_name=f"summaries_{lookup_id}.xlsx",
+                               mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        else:
+            st.error(f"Job `{lookup_id}` failed: {job['error']}")
+
+# --- Run Metrics Panel ---
+if st.session_state.run_metrics is not None:
+    run_summary = st.session_state.run_metrics.summary()
+    with st.sidebar:
+        st.header("Last Run Metrics")
+        rate_col, calls_col = st.columns(2)
+        rate_col.metric("Rows / min", run_summary['rows_per_minute'])
+        calls_col.metric("API calls", run_summary['calls'], help=f"{run_summary['retries']} retries")
+        p50_col, p95_col, p99_col = st.columns(3)
+        p50_col.metric("p50 (s)", run_summary['latency_p50'])
+        p95_col.metric("p95 (s)", run_summary['latency_p95'])
+        p99_col.metric("p99 (s)", run_summary['latency_p99'])
+        if run_summary['hedges_issued']:
+            hedged_col, won_col = st.columns(2)
+            hedged_col.metric("Hedges sent", run_summary['hedges_issued'],
+                              help=f"{run_summary['hedge_extra_requests_pct']}% extra requests")
+            won_col.metric("Hedges won", run_summary['hedges_won'])
+            st.caption(f"p99 without hedging: {run_summary['latency_p99_unhedged']} s")
+        tokens_col, cost_col = st.columns(2)
+        tokens_col.metric("Tokens / candidate", run_summary['tokens_per_candidate'],
+                          help="Estimated locally" if run_summary['tokens_estimated'] else "From API usage metadata")
+        cost_col.metric("Est. cost (USD)", run_summary['estimated_cost_usd'],
+                        help=f"{run_summary['cached_prompt_pct']}% of input tokens were served from the "
+                             "context cache at the reduced cached-input price")
+        with st.expander("All run statistics"):
+            st.json(run_summary)
+        st.download_button("📊 Download metrics (JSON)", data=st.session_state.run_metrics.to_json(),
+                           file_name="run_metrics.json", mime="application/json")
+        st.download_button("📊 Download per-call metrics (CSV)", data=st.session_state.run_metrics.calls_csv(),
+                           file_name="run_calls.csv", mime="text/csv")
@@ -0,0 +1,292 @@
+# backends.py
+# Pluggable model backends behind the `generate_content` interface used by
+# core.py: the real Gemini model and a local simulated one for offline
+# benchmarks and dry runs. Both can reuse the static prompt prefix through a
+# context cache (Gemini's CachedContent, or an emulation of it).
+import datetime
+import json
+import math
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from cache import cache_key
+from prompts import estimate_tokens
+from validator import SUMMARY_KEYS, TARGET_WORDS
+
+
+class ModelBackend:
+    """Interface every backend implements.
+
+    `generate_content(prompt, generation_config=None, timeout=None)` returns
+    an object with `.text` and, optionally, `.usage_metadata`
+    (prompt_token_count, candidates_token_count), like a genai response.
+    `timeout` is a per-request deadline in seconds. A prompts.RenderedPrompt
+    carries its static `prefix`, which backends may serve from a context
+    cache instead of sending it again.
+    """
+
+    model_name = None
+
+    def generate_content(self, prompt, generation_config=None, timeout=None):
+        raise NotImplementedError
+
+
+class PrefixCache:
+    """Registry of context-cached prompt prefixes with a time to live.
+
+    Entries are keyed by the SHA-256 of the model name and prefix text, so an
+    edited prompt gets a new entry and a stale prefix is never referenced.
+    `create(prefix)` runs at most once per key while the entry is fresh
+    (concurrent callers wait for it) and returns a backend-specific handle.
+    Entries are renewed `refresh_margin` seconds before the TTL ends so
+    in-flight requests never point at an expired cache. When `create` fails
+    the prefix is not retried until the TTL passes and `get` returns None,
+    meaning "send the full prompt"; those lookups count as `fallbacks`, not
+    `hits`.
+    """
+
+    def __init__(self, create, model_name, ttl_seconds=3600, refresh_margin=60, clock=time.monotonic):
+        self.create = create
+        self.model_name = model_name
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = min(refresh_margin, ttl_seconds / 2)
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.fallbacks = 0
+        self._clock = clock
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _key(self, prefix):
+        return cache_key(prefix, self.model_name)
+
+    def get(self, prefix):
+        """The handle for `prefix`, creating it if needed; None when caching failed."""
+        key = self._key(prefix)
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            now = self._clock()
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None and now < entry[1] - self.refresh_margin:
+                with self._lock:
+                    if entry[0] is None:
+                        self.fallbacks += 1
+                    else:
+                        self.hits += 1
+                return entry[0]
+            with self._lock:
+                self.misses += 1
+            try:
+                handle = self.create(prefix)
+            except Exception:
+                handle = None
+                with self._lock:
+                    self.failures += 1
+            with self._lock:
+                self._entries[key] = (handle, now + self.ttl_seconds)
+            return handle
+
+    def invalidate(self, prefix=None):
+        """Forgets one prefix (e.g. after the provider dropped it) or, by default, all of them."""
+        with self._lock:
+            if prefix is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self._key(prefix), None)
+
+
+class GeminiBackend(ModelBackend):
+    """google-generativeai model; `genai.configure(api_key=...)` must have been called.
+
+    With `context_cache`, the static prefix of each RenderedPrompt of at
+    least `min_cache_tokens` (estimated) is registered once as a CachedContent
+    and requests send only the per-candidate remainder. If the cache cannot
+    be created, or the provider no longer knows it, the full prompt is sent.
+    """
+
+    def __init__(self, model_name='gemini-2.5-pro', context_cache=True, cache_ttl=3600, min_cache_tokens=2048):
+        import google.generativeai as genai
+
+        self.model = genai.GenerativeModel(model_name)
+        self.model_name = self.model.model_name
+        self.cache_ttl = cache_ttl
+        self.min_cache_tokens = min_cache_tokens
+        self.prefix_cache = PrefixCache(self._create_cached_model, self.model_name, cache_ttl) if context_cache else None
+
+    def _create_cached_model(self, prefix):
+        import google.generativeai as genai
+        from google.generativeai import caching
+
+        cached = caching.CachedContent.create(model=self.model_name, contents=[prefix],
+                                              ttl=datetime.timedelta(seconds=self.cache_ttl))
+        return genai.GenerativeModel.from_cached_content(cached)
+
+    def generate_content(self, prompt, generation_config=None, timeout=None):
+        request_options = {'timeout': timeout} if timeout else None
+        prefix = getattr(prompt, 'prefix', '')
+        if self.prefix_cache is not None and prefix and estimate_tokens(prefix) >= self.min_cache_tokens:
+            cached_model = self.prefix_cache.get(prefix)
+            if cached_model is not None:
+                try:
+                    return cached_model.generate_content(prompt.remainder, generation_config=generation_config,
+                                                         request_options=request_options)
+                except Exception as e:
+                    if type(e).__name__ != 'NotFound':
+                        raise
+                    # The cache expired or was deleted on the provider side.
+                    self.prefix_cache.invalidate(prefix)
+        return self.model.generate_content(str(prompt), generation_config=generation_config,
+                                           request_options=request_options)
+
+
+# --- Simulated Backend ---
+
+class SimulatedRateLimit(Exception):
+    """Stands in for google.api_core.exceptions.ResourceExhausted."""
+    code = 429
+
+
+class SimulatedUnavailable(Exception):
+    """Stands in for google.api_core.exceptions.ServiceUnavailable."""
+    code = 503
+
+
+class SimulatedDeadlineExceeded(Exception):
+    """Stands in for google.api_core.exceptions.DeadlineExceeded."""
+    code = 504
+
+
+def simulated_summary(words, name='The candidate'):
+    """Placeholder summary of about `words` words that passes validator.py."""
+    bullet = "* Shows a consistent and practical approach."
+    paragraph = " ".join([name] + ["word"] * (words - 24 - len(name.split())))
+    return (f"{paragraph}\n\n**Strengths:**\n{bullet}\n{bullet}"
+            f"\n\n**Development Areas:**\n{bullet}\n{bullet}")
+
+
+class SimulatedBackend(ModelBackend):
+    """Local stand-in for Gemini with configurable latency and failure modes.
+
+    Latency is `overhead + input_tokens * seconds_per_input_token +
+    output_tokens * seconds_per_output_token`, multiplied by log-normal
+    jitter (`jitter_sigma`) and, with probability `slow_rate`, by
+    `slow_multiplier` to model stragglers. Pass `latency_sampler(prompt_tokens,
+    output_tokens, rng)` to use a different distribution. Each call fails
+    with a 429 with probability `rate_limit_rate`, a 503 with `error_rate`,
+    and returns truncated JSON with `malformed_rate`. Sleeps are multiplied
+    by `time_scale` so large simulations run quickly; a `timeout` (in real
+    seconds) cuts a slower call short with a 504.
+
+    With `context_cache`, prompt prefixes are "registered" in a PrefixCache
+    (TTL `cache_ttl` real seconds; registration costs one prefix-processing
+    delay) and cached prefix tokens are processed at `cached_token_factor`
+    of the normal per-token time and reported as `cached_content_token_count`.
+    """
+
+    model_name = 'simulated-gemini'
+
+    def __init__(self, overhead=2.0, seconds_per_input_token=0.0002, seconds_per_output_token=0.02,
+                 jitter_sigma=0.3, slow_rate=0.0, slow_multiplier=5.0, error_rate=0.0, rate_limit_rate=0.0,
+                 malformed_rate=0.0, latency_sampler=None, time_scale=1.0, seed=None, context_cache=False,
+                 cache_ttl=3600, cached_token_factor=0.1):
+        self.overhead = overhead
+        self.seconds_per_input_token = seconds_per_input_token
+        self.seconds_per_output_token = seconds_per_output_token
+        self.jitter_sigma = jitter_sigma
+        self.slow_rate = slow_rate
+        self.slow_multiplier = slow_multiplier
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.latency_sampler = latency_sampler
+        self.time_scale = time_scale
+        self.cached_token_factor = cached_token_factor
+        self.prefix_cache = PrefixCache(self._register_prefix, self.model_name, cache_ttl) if context_cache else None
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _draw(self):
+        with self._lock:
+            self.calls += 1
+            return self._rng.random(), self._rng.random(), self._rng.lognormvariate(0, self.jitter_sigma)
+
+    def latency(self, prompt_tokens, output_tokens, jitter=1.0, slow=False):
+        if self.latency_sampler is not None:
+            with self._lock:
+                return self.latency_sampler(prompt_tokens, output_tokens, self._rng)
+        base = (self.overhead + prompt_tokens * self.seconds_per_input_token
+                + output_tokens * self.seconds_per_output_token)
+        return base * jitter * (self.slow_multiplier if slow else 1.0)
+
+    def _register_prefix(self, prefix):
+        """Emulated CachedContent.create: one pass over the prefix; the handle is its token count."""
+        tokens = estimate_tokens(prefix)
+        time.sleep((self.overhead + tokens * self.seconds_per_input_token) * self.time_scale)
+        return tokens
+
+    def _payload(self, prompt, generation_config):
+        """Builds a response matching what the prompt (or schema) asks for."""
+        keys = SUMMARY_KEYS
+        schema = (generation_config or {}).get('response_schema')
+        if schema is not None:
+            properties = schema.get('items', schema).get('properties', {})
+            keys = tuple(key for key in properties if key in TARGET_WORDS)
+        else:
+            requested = re.search(r"with only these keys: (.+?)\.", prompt)
+            if requested:
+                keys = tuple(key for key in re.findall(r'"(summary_\d+)"', requested.group(1)))
+        names = re.findall(r"\* \*\*Name:\*\* (.+)", prompt)
+        ids = re.findall(r"\*\*Candidate ID:\*\* (\d+)", prompt)
+        if ids:
+            return [dict(id=candidate_id, **{key: simulated_summary(TARGET_WORDS[key], name) for key in keys})
+                    for candidate_id, name in zip(ids, names)]
+        name = names[0] if names else 'The candidate'
+        return {key: simulated_summary(TARGET_WORDS[key], name) for key in keys}
+
+    def generate_content(self, prompt, generation_config=None, timeout=None):
+        failure_roll, slow_roll, jitter = self._draw()
+        payload = self._payload(prompt, generation_config)
+        text = json.dumps(payload)
+        prompt_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(text)
+        cached_tokens = 0
+        prefix = getattr(prompt, 'prefix', '')
+        if self.prefix_cache is not None and prefix:
+            cached_tokens = self.prefix_cache.get(prefix) or 0
+        processed_tokens = prompt_tokens - cached_tokens * (1 - self.cached_token_factor)
+        delay = self.latency(processed_tokens, output_tokens, jitter, slow_roll < self.slow_rate) * self.time_scale
+        if timeout and delay > timeout:
+            time.sleep(timeout)
+            raise SimulatedDeadlineExceeded("504 Deadline Exceeded (simulated).")
+        time.sleep(delay)
+
+        if failure_roll < self.rate_limit_rate:
+            raise SimulatedRateLimit("429 Resource has been exhausted (simulated).")
+        failure_roll -= self.rate_limit_rate
+        if failure_roll < self.error_rate:
+            raise SimulatedUnavailable("503 The model is overloaded (simulated).")
+        failure_roll -= self.error_rate
+        if failure_roll < self.malformed_rate:
+            text = text[:max(1, math.floor(len(text) * 0.6))]
+        usage = SimpleNamespace(prompt_token_count=prompt_tokens, candidates_token_count=output_tokens,
+                                cached_content_token_count=cached_tokens)
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+
+BACKENDS = {'gemini': GeminiBackend, 'simulated': SimulatedBackend}
+
+
+def create_backend(name, **options):
+    """Instantiates a backend by name ('gemini' or 'simulated')."""
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend '{name}'. Choose from: {', '.join(BACKENDS)}.") from None
+    return backend_class(**options)
@@ -0,0 +1,158 @@
+# benchmark.py
+# Offline benchmarks against the simulated backend, so no API quota is spent.
+#
+#     python benchmark.py pipeline --sizes 10 100 1000 10000
+#     python benchmark.py batching --candidates 60
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from backends import SimulatedBackend
+from core import (
+    CANDIDATE_COLUMNS,
+    GENDERS,
+    GENERATION_MODES,
+    LEVEL_NAMES,
+    MODE_FULL,
+    build_results_df,
+    generate_rows,
+    prepare_rows,
+)
+from metrics import RunMetrics
+from resilience import CircuitBreaker, ResilientModel, RetryPolicy, make_hedge_policy
+from scoring import ALL_COMPETENCIES
+from streaming import dataframe_to_xlsx_bytes
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+
+
+def synthetic_candidates(count, seed=0):
+    """Random candidates with the same columns as the sample template (core.SAMPLE_CANDIDATES)."""
+    rng = np.random.default_rng(seed)
+    data = {
+        'Name': [f"Candidate {index + 1}" for index in range(count)],
+        'Gender': rng.choice(GENDERS, count),
+        'Level': rng.choice(LEVEL_NAMES, count),
+    }
+    for column in ALL_COMPETENCIES:
+        data[column] = rng.uniform(1.0, 5.0, count).round(2)
+    return pd.DataFrame(data, columns=CANDIDATE_COLUMNS)
+
+
+def benchmark_pipeline(sizes=DEFAULT_SIZES, mode=MODE_FULL, batch_size=1, max_workers=16, time_scale=0.002,
+                       backend_options=None, hedge_percentile=None, hedge_budget=0.1):
+    """Runs generation and export at each cohort size against the simulated backend.
+
+    Latencies are reported in simulated seconds (real time / `time_scale`);
+    peak memory is the tracemalloc peak for the whole run including export.
+    With `hedge_percentile`, slow calls are hedged and the p99 the same calls
+    would have had without hedging is reported alongside.
+    """
+    report = []
+    for size in sizes:
+        df = synthetic_candidates(size)
+        backend = SimulatedBackend(time_scale=time_scale, seed=size, **(backend_options or {}))
+        metrics = RunMetrics(backend.model_name)
+        client = ResilientModel(backend, retry_policy=RetryPolicy(base_delay=0.01), breaker=CircuitBreaker(),
+                                metrics=metrics, hedge_policy=make_hedge_policy(hedge_percentile,
+                                                                                max_extra_fraction=hedge_budget),
+                                max_workers=max_workers)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        results = generate_rows(prepare_rows(df, mode), model=client, mode=mode, batch_size=batch_size,
+                                max_workers=max_workers, metrics=metrics)
+        metrics.finish()
+        generated = time.perf_counter()
+        results_df = build_results_df(df, {result.position: result.summaries for result in results},
+                                      {result.position: result.failure for result in results if result.error})
+        dataframe_to_xlsx_bytes(results_df)
+        exported = time.perf_counter()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        summary = metrics.summary()
+        simulated = lambda seconds: round(seconds / time_scale, 2) if seconds is not None else None
+        report.append({
+            'Candidates': size,
+            'Calls': summary['calls'],
+            'Failed rows': summary['failed_rows'],
+            'Rows / simulated min': round(size / ((generated - start) / time_scale) * 60, 1),
+            'p50 (sim s)': simulated(summary['latency_p50']),
+            'p95 (sim s)': simulated(summary['latency_p95']),
+            'p99 (sim s)': simulated(summary['latency_p99']),
+            'p99 unhedged (sim s)': simulated(summary['latency_p99_unhedged']),
+            'Hedges sent / won': f"{summary['hedges_issued']} / {summary['hedges_won']}",
+            'Cached input %': summary['cached_prompt_pct'],
+            'Peak memory (MB)': round(peak / 2 ** 20, 1),
+            'Export (s)': round(exported - generated, 3),
+        })
+    return report
+
+
+def benchmark_batching(candidates=60, batch_sizes=(1, 2, 5, 10), max_workers=1, time_scale=0.001):
+    """Per-candidate time and input tokens for several batch sizes."""
+    df = synthetic_candidates(candidates)
+    rows = prepare_rows(df)
+    report = []
+    for batch_size in batch_sizes:
+        backend = SimulatedBackend(time_scale=time_scale, jitter_sigma=0.0, seed=batch_size)
+        metrics = RunMetrics(backend.model_name)
+        start = time.perf_counter()
+        generate_rows(rows, model=backend, batch_size=batch_size, max_workers=max_workers, metrics=metrics)
+        elapsed = (time.perf_counter() - start) / time_scale
+        summary = metrics.summary()
+        report.append({
+            'Batch size': batch_size,
+            'Requests': summary['calls'],
+            'Input tokens / candidate': round(summary['prompt_tokens'] / candidates),
+            'Simulated seconds / candidate': round(elapsed / candidates, 2),
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks against the simulated backend.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    pipeline = subparsers.add_parser("pipeline", help="Throughput, tail latency, memory and export time by cohort size.")
+    pipeline.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    pipeline.add_argument("--mode", choices=GENERATION_MODES, default=MODE_FULL)
+    pipeline.add_argument("--batch-size", type=int, default=1)
+    pipeline.add_argument("--workers", type=int, default=16)
+    pipeline.add_argument("--time-scale", type=float, default=0.002)
+    pipeline.add_argument("--error-rate", type=float, default=0.02)
+    pipeline.add_argument("--rate-limit-rate", type=float, default=0.02)
+    pipeline.add_argument("--malformed-rate", type=float, default=0.01)
+    pipeline.add_argument("--slow-rate", type=float, default=0.02)
+    pipeline.add_argument("--context-cache", action="store_true", help="Emulate provider context caching.")
+    pipeline.add_argument("--hedge-percentile", type=float, default=None)
+    pipeline.add_argument("--hedge-budget", type=float, default=0.1)
+
+    batching = subparsers.add_parser("batching", help="Compare candidates-per-request settings.")
+    batching.add_argument("--candidates", type=int, default=60)
+    batching.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 5, 10])
+    args = parser.parse_args()
+
+    if args.benchmark == "pipeline":
+        report = benchmark_pipeline(
+            args.sizes, mode=args.mode, batch_size=args.batch_size, max_workers=args.workers,
+            time_scale=args.time_scale, hedge_percentile=args.hedge_percentile, hedge_budget=args.hedge_budget,
+            backend_options={
+                'error_rate': args.error_rate,
+                'rate_limit_rate': args.rate_limit_rate,
+                'malformed_rate': args.malformed_rate,
+                'slow_rate': args.slow_rate,
+                'context_cache': args.context_cache,
+            },
+        )
+    else:
+        report = benchmark_batching(args.candidates, tuple(args.batch_sizes))
+    print(pd.DataFrame(report).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# cache.py
+# Persistent, content-addressed cache for parsed summary triples.
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_CACHE_PATH = os.path.join(".summary_cache", "summaries.sqlite3")
+
+
+def cache_key(prompt, model_name):
+    """SHA-256 of the model name and the fully rendered prompt."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def model_name_of(model):
+    """Best-effort model identifier (`genai.GenerativeModel.model_name` or the class name)."""
+    return getattr(model, "model_name", None) or type(model).__name__
+
+
+class SummaryCache:
+    """SQLite-backed cache of (summary_200, summary_150, summary_100) triples.
+
+    Entries older than `max_age_seconds` are treated as misses and pruned;
+    when more than `max_entries` are stored the least recently used ones
+    are evicted. With `bypass=True` lookups always miss but fresh results
+    are still stored. Safe to share between worker threads.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=50000, max_age_seconds=30 * 24 * 3600, bypass=False):
+        self.path = path
+        self.bypass = bypass
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        """Returns the cached triple for `key`, or None on a miss."""
+        if self.bypass:
+            with self._lock:
+                self.misses += 1
+            return None
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT value, created FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.max_age_seconds and now - row[1] > self.max_age_seconds:
+                conn.execute("DELETE FROM summaries WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE summaries SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return tuple(json.loads(row[0]))
+
+    def put(self, key, summaries):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(list(summaries)), now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        if self.max_age_seconds:
+            conn.execute("DELETE FROM summaries WHERE created < ?", (now - self.max_age_seconds,))
+        if self.max_entries:
+            conn.execute(
+                "DELETE FROM summaries WHERE key IN ("
+                " SELECT key FROM summaries ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        """Drops every entry, e.g. after `DEFINITIVE_PROMPT` has been edited."""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM summaries")
+
+    def __len__(self):
+        with self._lock, self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
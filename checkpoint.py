@@ -0,0 +1,72 @@
+# checkpoint.py
+# Durable, append-only per-run checkpoints so completed rows survive reruns,
+# browser refreshes and crashes.
+import hashlib
+import json
+import os
+import threading
+
+DEFAULT_CHECKPOINT_DIR = ".summary_checkpoints"
+
+
+def upload_hash(data):
+    """SHA-256 of the uploaded file's bytes; identifies a run across reruns."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path, block_size=1 << 20):
+    """Same as `upload_hash`, but reads the file from disk in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class RunCheckpoint:
+    """JSONL file of completed rows, one `{"row": ..., "summaries": [...]}` per line.
+
+    Only successful rows are recorded, so failed rows are picked up again on
+    resume. A torn last line (e.g. after a crash mid-write) is ignored.
+    """
+
+    def __init__(self, run_id, directory=DEFAULT_CHECKPOINT_DIR):
+        self.path = os.path.join(directory, f"{run_id}.jsonl")
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def load(self):
+        """Returns {row_index: (summary_200, summary_150, summary_100)}."""
+        completed = {}
+        if not os.path.exists(self.path):
+            return completed
+        with open(self.path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                completed[record["row"]] = tuple(record["summaries"])
+        return completed
+
+    def _ends_with_newline(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return True
+        with open(self.path, "rb") as handle:
+            handle.seek(-1, os.SEEK_END)
+            return handle.read(1) == b"\n"
+
+    def append(self, row_index, summaries):
+        line = json.dumps({"row": int(row_index), "summaries": list(summaries)}, ensure_ascii=False)
+        with self._lock:
+            # After a torn write, start on a fresh line so this record stays readable.
+            prefix = "" if self._ends_with_newline() else "\n"
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(prefix + line + "\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+
+    def clear(self):
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
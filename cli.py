@@ -0,0 +1,186 @@
+# cli.py
+# Headless batch entry point for cron/container jobs. Reuses the same core
+# generation logic as the Streamlit app, reading and writing in chunks so
+# memory stays flat for very large cohorts.
+#
+#     GOOGLE_API_KEY=... python cli.py candidates.xlsx summaries.xlsx --workers 8
+import argparse
+import os
+import sys
+import time
+
+from backends import BACKENDS, create_backend
+from cache import SummaryCache
+from checkpoint import RunCheckpoint, file_hash
+from core import (
+    FAILURE_COLUMN,
+    GENERATION_MODES,
+    MODE_FULL,
+    MODE_SIGNATURE,
+    MODE_TEMPLATE,
+    SUMMARY_COLUMNS,
+    build_results_df,
+    generate_rows,
+    group_by_signature,
+    prepare_rows,
+    signature_report,
+)
+from engine import RateLimiter
+from metrics import RunMetrics
+from preflight import validate_cohort
+from resilience import CircuitBreaker, ResilientModel, RetryPolicy, make_hedge_policy
+from streaming import open_writer, read_chunks
+
+DEFAULT_MODEL = 'gemini-2.5-pro'
+# Kept apart from the app's checkpoints (checkpoint.DEFAULT_CHECKPOINT_DIR): both are
+# keyed by the input's hash, and a fresh CLI run clears its own.
+CLI_CHECKPOINT_DIR = '.summary_checkpoints_cli'
+
+
+def load_model(args):
+    """Creates the selected backend; Gemini is configured from GOOGLE_API_KEY."""
+    cache_options = {'context_cache': not args.no_context_cache, 'cache_ttl': args.context_cache_ttl}
+    if args.backend == 'simulated':
+        return create_backend('simulated', time_scale=args.simulated_time_scale, **cache_options)
+    import google.generativeai as genai
+
+    api_key = os.environ.get('GOOGLE_API_KEY')
+    if not api_key:
+        raise SystemExit("GOOGLE_API_KEY is not set.")
+    genai.configure(api_key=api_key)
+    return create_backend('gemini', model_name=args.model, **cache_options)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate assessment summaries for a candidate file.")
+    parser.add_argument('input', help="Candidate file (.xlsx, .csv or .parquet).")
+    parser.add_argument('output', help="Result file (.xlsx or .csv).")
+    parser.add_argument('--mode', choices=GENERATION_MODES, default=MODE_FULL,
+                        help="full: complete prompt; resolved: locally banded texts; signature: one resolved request "
+                             "per group of identical band profiles; template: offline, no API.")
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='gemini',
+                        help="'simulated' runs the whole pipeline offline against a local fake model.")
+    parser.add_argument('--simulated-time-scale', type=float, default=0.01,
+                        help="Multiplier on the simulated backend's latencies.")
+    parser.add_argument('--sheet', default=None, help="Worksheet to read (default: the first one).")
+    parser.add_argument('--workers', type=int, default=4, help="Concurrent requests.")
+    parser.add_argument('--batch-size', type=int, default=1, help="Candidates per request.")
+    parser.add_argument('--rpm', type=int, default=60, help="Requests per minute (0 = unlimited).")
+    parser.add_argument('--tpm', type=int, default=0, help="Tokens per minute (0 = unlimited).")
+    parser.add_argument('--max-attempts', type=int, default=4,
+                        help="Attempts per request for rate-limit, overload and timeout errors.")
+    parser.add_argument('--deadline', type=float, default=300,
+                        help="Seconds before an unanswered request is abandoned and retried (0 = none).")
+    parser.add_argument('--hedge-percentile', type=float, default=None,
+                        help="Send a duplicate of requests slower than this percentile of recent ones (e.g. 95).")
+    parser.add_argument('--hedge-budget', type=float, default=0.1,
+                        help="Maximum extra requests from hedging, as a fraction of requests.")
+    parser.add_argument('--chunk-size', type=int, default=500, help="Rows read and written per chunk.")
+    parser.add_argument('--no-cache', action='store_true', help="Do not read or write the response cache.")
+    parser.add_argument('--refresh-cache', action='store_true', help="Ignore cached responses but store new ones.")
+    parser.add_argument('--no-context-cache', action='store_true',
+                        help="Send the full prompt every time instead of caching its static prefix with the provider.")
+    parser.add_argument('--context-cache-ttl', type=int, default=3600,
+                        help="Seconds a cached prompt prefix is kept before it is registered again.")
+    parser.add_argument('--metrics', default=None,
+                        help="Write run metrics here: .json for summary plus calls, .csv for per-call records.")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip rows already completed by an earlier run of the same input file.")
+    parser.add_argument('--checkpoint-dir', default=CLI_CHECKPOINT_DIR,
+                        help="Where completed rows are recorded for --resume.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    model = None if args.mode == MODE_TEMPLATE else load_model(args)
+    cache = None if args.no_cache else SummaryCache(bypass=args.refresh_cache)
+    metrics = RunMetrics(getattr(model, 'model_name', None))
+    client = ResilientModel(model, rate_limiter=RateLimiter(args.rpm, args.tpm),
+                            retry_policy=RetryPolicy(max_attempts=args.max_attempts), breaker=CircuitBreaker(),
+                            metrics=metrics,
+                            hedge_policy=make_hedge_policy(args.hedge_percentile, args.deadline, args.hedge_budget),
+                            max_workers=args.workers)
+    checkpoint = RunCheckpoint(file_hash(args.input), directory=args.checkpoint_dir)
+    completed_rows = checkpoint.load() if args.resume else {}
+    if not args.resume:
+        checkpoint.clear()
+
+    writer = None
+    offset = 0
+    failures = 0
+    invalid = 0
+    signature_groups = 0
+    start = time.monotonic()
+    try:
+        for chunk in read_chunks(args.input, chunk_size=args.chunk_size, sheet_name=args.sheet):
+            # Rows failing pre-flight validation are written with their errors and
+            # never sent; duplicate names are detected within a chunk.
+            preflight = validate_cohort(chunk)
+            if preflight.missing_columns:
+                raise SystemExit(f"{args.input} is missing required columns: {', '.join(preflight.missing_columns)}")
+            chunk = preflight.cleaned
+            if writer is None:
+                writer = open_writer(args.output, list(chunk.columns) + SUMMARY_COLUMNS + [FAILURE_COLUMN])
+
+            summaries_by_row = {
+                position: completed_rows[offset + position]
+                for position in range(len(chunk)) if offset + position in completed_rows
+            }
+            failures_by_row = preflight.failures()
+            for position, failure in failures_by_row.items():
+                print(f"row {offset + position + 1}: {failure}", file=sys.stderr)
+            invalid += len(failures_by_row)
+            pending = [position for position in preflight.valid_positions if position not in summaries_by_row]
+            all_rows = prepare_rows(chunk, args.mode)
+            rows = [all_rows[position] for position in pending]
+            if args.mode == MODE_SIGNATURE:
+                # Groups are formed per chunk; the response cache shares them across chunks.
+                signature_groups += signature_report(group_by_signature(rows))['groups']
+            results = generate_rows(
+                rows, model=client, mode=args.mode,
+                batch_size=args.batch_size, max_workers=args.workers, cache=cache, metrics=metrics,
+            )
+            for result in results:
+                position = pending[result.position]
+                summaries_by_row[position] = result.summaries
+                if result.error:
+                    failures += 1
+                    failures_by_row[position] = result.failure
+                    print(f"row {offset + position + 1}: {result.error}", file=sys.stderr)
+                else:
+                    checkpoint.append(offset + position, result.summaries)
+
+            writer.write(build_results_df(chunk, summaries_by_row, failures_by_row))
+            offset += len(chunk)
+            print(f"{offset} rows written ({time.monotonic() - start:.1f}s elapsed)", file=sys.stderr)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    metrics.finish()
+    if args.metrics:
+        with open(args.metrics, 'w', encoding='utf-8') as handle:
+            handle.write(metrics.calls_csv() if args.metrics.lower().endswith('.csv') else metrics.to_json())
+    run_summary = metrics.summary()
+    print(f"throughput: {run_summary['rows_per_minute']} rows/min, latency p50/p95/p99: "
+          f"{run_summary['latency_p50']}/{run_summary['latency_p95']}/{run_summary['latency_p99']}s, "
+          f"est. cost: {run_summary['estimated_cost_usd']} USD "
+          f"({run_summary['cached_prompt_pct']}% of input tokens from the context cache)", file=sys.stderr)
+    if run_summary['hedges_issued']:
+        print(f"hedges: {run_summary['hedges_issued']} sent ({run_summary['hedge_extra_requests_pct']}% extra), "
+              f"{run_summary['hedges_won']} won; p99 {run_summary['latency_p99_unhedged']}s unhedged -> "
+              f"{run_summary['latency_p99']}s", file=sys.stderr)
+    if args.mode == MODE_SIGNATURE:
+        print(f"band-signature groups: {signature_groups} for {run_summary['rows']} rows "
+              f"({run_summary['rows'] - signature_groups} calls saved)", file=sys.stderr)
+    if cache is not None:
+        print(f"cache: {cache.hits} hits, {cache.misses} misses", file=sys.stderr)
+    print(f"retries: {client.retries}, circuit breaker pauses: {client.breaker.trips}", file=sys.stderr)
+    print(f"done: {offset} rows, {invalid} invalid, {failures} failed -> {args.output}", file=sys.stderr)
+    return 1 if failures or invalid else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
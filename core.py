@@ -0,0 +1,426 @@
+# core.py
+# Generation logic shared by the Streamlit app and the batch engine.
+# Nothing in here touches Streamlit, so it can run in worker threads.
+from functools import partial
+
+import pandas as pd
+
+from cache import cache_key, model_name_of
+from engine import RowResult, run_batch, run_batches
+from resilience import CircuitBreaker, ResilientModel, RetryPolicy, accepts_generation_config, classify_error
+from prompts import (
+    RESOLVED_PROMPT,
+    prompt_for_level,
+    render_batch_task,
+    render_candidate,
+    render_resolved_candidate,
+    render_task,
+    variant_output_instruction,
+)
+from scoring import (
+    ALL_COMPETENCIES,
+    PLACEHOLDER_NAME,
+    add_bands,
+    band_signature,
+    resolve_interpretations,
+    substitute_name,
+    template_summaries,
+)
+from validator import (
+    SUMMARY_KEYS,
+    extract_json,
+    is_hard_failure,
+    structured_output_config,
+    validate_summaries,
+    validate_summary,
+)
+
+MODE_FULL = "full"
+MODE_RESOLVED = "resolved"
+MODE_TEMPLATE = "template"
+MODE_SIGNATURE = "signature"
+GENERATION_MODES = (MODE_FULL, MODE_RESOLVED, MODE_SIGNATURE, MODE_TEMPLATE)
+
+CANDIDATE_COLUMNS = ['Name', 'Gender', 'Level'] + ALL_COMPETENCIES
+GENDERS = ['She/Her', 'He/Him', 'They/Them']
+LEVEL_NAMES = ['Apply', 'Shape', 'Guide']
+SAMPLE_CANDIDATES = {
+    'Name': ['Jane Doe', 'John Smith'],
+    'Gender': ['She/Her', 'He/Him'],
+    'Level': ['Apply', 'Shape'],
+    'Overall Leadership': [4.1, 2.8],
+    'Reasoning & Problem Solving': [3.5, 3.1],
+    'Drives Results': [4.5, 2.5],
+    'Leads People': [3.9, 3.2],
+    'Manages Stakeholders': [4.2, 2.9],
+    'Thinks Strategically': [3.8, 3.4],
+    'Solves Challenges': [4.0, 3.8],
+    'Steers Change': [3.7, 2.7]
+}
+
+SUMMARY_COLUMNS = ['Summary (200 words)', 'Summary (150 words)', 'Summary (100 words)']
+FAILURE_COLUMN = 'Failure Reason'
+
+
+class SummaryGenerationError(Exception):
+    """Raised when a candidate's summaries could not be generated or parsed.
+
+    `reason` is one of the failure reasons from resilience.py.
+    """
+
+    def __init__(self, message, reason):
+        super().__init__(message)
+        self.reason = reason
+
+
+def build_prompt(row):
+    """Renders the compiled, Level-specific prompt for a single candidate."""
+    return prompt_for_level(row['Level']).render(render_task(render_candidate(row)))
+
+
+def build_resolved_prompt(row):
+    """Renders the prompt carrying only the pre-resolved interpretation texts.
+
+    `row` must come from `scoring.add_bands`.
+    """
+    return RESOLVED_PROMPT.render(render_task(render_resolved_candidate(row, *resolve_interpretations(row))))
+
+
+def build_variant_prompt(row, problems, resolved=False):
+    """Prompt asking again for only the variants in `problems` (key -> problems)."""
+    template = RESOLVED_PROMPT if resolved else prompt_for_level(row['Level'])
+    return template.render(render_task(_candidate_section(row, resolved), variant_output_instruction(problems)))
+
+
+def _prompt_for(row, resolved):
+    """The single-candidate prompt for `row` in full or pre-resolved form."""
+    return build_resolved_prompt(row) if resolved else build_prompt(row)
+
+
+def _row_error(row, error, raw=None):
+    """Wraps `error` in a SummaryGenerationError naming the candidate (and the raw response, if any)."""
+    message = f"Failed to process {row.get('Name', 'Unknown Candidate')}. Error: {str(error)}"
+    if raw is not None:
+        message += f". Raw Response: {raw}"
+    return SummaryGenerationError(message, classify_error(error))
+
+
+def _candidate_section(row, resolved):
+    """The **Candidate Data:** section in full or pre-resolved form."""
+    return render_resolved_candidate(row, *resolve_interpretations(row)) if resolved else render_candidate(row)
+
+
+def _call_structured(model, prompt, keys=SUMMARY_KEYS, batch=False):
+    """Calls the model, asking for schema-constrained JSON when the backend supports it."""
+    if accepts_generation_config(model):
+        return model.generate_content(prompt, generation_config=structured_output_config(keys, batch))
+    return model.generate_content(prompt)
+
+
+def repair_variants(row, summaries, model, resolved=False, attempts=1):
+    """Regenerates only the variants of `summaries` that fail validation.
+
+    Returns (summaries, problems) where problems maps each key to what is
+    still wrong with it after up to `attempts` targeted requests.
+    """
+    summaries = dict(summaries)
+    problems = validate_summaries(summaries)
+    for _ in range(attempts):
+        failing = {key: items for key, items in problems.items() if items}
+        if not failing:
+            break
+        try:
+            response = _call_structured(model, build_variant_prompt(row, failing, resolved), keys=tuple(failing))
+        except Exception:
+            # The repair is best effort: an overloaded or unreachable model keeps the original variants.
+            break
+        try:
+            fixes = extract_json(response.text)
+        except ValueError:
+            continue
+        if not isinstance(fixes, dict):
+            continue
+        for key, items in failing.items():
+            fix_problems = validate_summary(key, fixes.get(key))
+            if not is_hard_failure(fix_problems) and len(fix_problems) < len(items):
+                summaries[key] = fixes[key]
+        problems = validate_summaries(summaries)
+    return summaries, problems
+
+
+def _finish_summaries(row, summaries, model, resolved):
+    """Repairs failing variants and returns (triple, fully_valid).
+
+    Missing variants are fatal; length or bullet issues that survive the
+    targeted retry are accepted as they are.
+    """
+    summaries, problems = repair_variants(row, summaries if isinstance(summaries, dict) else {}, model, resolved)
+    missing = [key for key, items in problems.items() if is_hard_failure(items)]
+    if missing:
+        raise ValueError(f"Response is missing {', '.join(missing)}")
+    return tuple(summaries[key] for key in SUMMARY_KEYS), not any(problems.values())
+
+
+def generate_summaries_for_candidate(row, model, cache=None, resolved=False, retry_imperfect=False):
+    """Constructs the prompt and calls the Gemini API for a single candidate.
+
+    `model` is any backends.ModelBackend (or object with a compatible
+    `generate_content`), so the simulated backend or a local fake can stand
+    in for Gemini; backends that accept `generation_config` are asked for
+    schema-constrained JSON. Variants failing local validation
+    are regenerated on their own. When a SummaryCache is given, a hit skips
+    the API call entirely; every accepted triple is cached, including ones
+    whose length or bullets stayed off after repair, unless
+    `retry_imperfect=True` asks for those to be regenerated next run. With
+    `resolved=True` the bands and ordering computed by `scoring.add_bands`
+    are sent instead of the full rules.
+    Raises SummaryGenerationError on failure.
+    """
+    key = None
+    if cache is not None:
+        try:
+            key = cache_key(_prompt_for(row, resolved), model_name_of(model))
+        except Exception as e:
+            raise _row_error(row, e) from e
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    result, valid = _generate_single(row, model, resolved)
+    if cache is not None and (valid or not retry_imperfect):
+        cache.put(key, result)
+    return result
+
+
+def build_batch_prompt(rows, resolved=False):
+    """Renders one prompt covering several candidates (Candidate IDs 1..N).
+
+    In full-prompt mode all rows should share a Level so the compiled
+    Level template applies; mixed Levels fall back to every PART B block.
+    """
+    candidates = [_candidate_section(row, resolved) for row in rows]
+    if resolved:
+        return RESOLVED_PROMPT.render(render_batch_task(candidates))
+    levels = {str(row['Level']).strip().upper() for row in rows}
+    template = prompt_for_level(levels.pop()) if len(levels) == 1 else prompt_for_level(None)
+    return template.render(render_batch_task(candidates))
+
+
+def parse_batch_response(text):
+    """Parses a JSON array of per-candidate objects into {id: {summary key: text}}.
+
+    Entries that are not objects or carry no summary at all are skipped, so
+    the caller can retry just those candidates.
+    """
+    entries = extract_json(text)
+    if not isinstance(entries, list):
+        raise ValueError("Expected a JSON array of candidate objects.")
+    parsed = {}
+    for entry in entries:
+        if not isinstance(entry, dict) or 'id' not in entry:
+            continue
+        if any(isinstance(entry.get(key), str) and entry[key].strip() for key in SUMMARY_KEYS):
+            parsed[str(entry['id']).strip()] = entry
+    return parsed
+
+
+def _generate_batch(rows, model, resolved):
+    """Returns a (triple, fully_valid) pair or SummaryGenerationError per row, splitting on bad output."""
+    if len(rows) == 1:
+        try:
+            return [_generate_single(rows[0], model, resolved)]
+        except SummaryGenerationError as e:
+            return [e]
+
+    prompt = build_batch_prompt(rows, resolved)
+    try:
+        response = _call_structured(model, prompt, batch=True)
+    except Exception as e:
+        error = SummaryGenerationError(f"Batch request for {len(rows)} candidates failed. Error: {str(e)}",
+                                       classify_error(e))
+        return [error] * len(rows)
+
+    try:
+        parsed = parse_batch_response(response.text)
+    except Exception:
+        parsed = {}
+    outcomes = [None] * len(rows)
+    for index, row in enumerate(rows):
+        entry = parsed.get(str(index + 1))
+        if entry is None:
+            continue
+        try:
+            outcomes[index] = _finish_summaries(row, entry, model, resolved)
+        except Exception as e:
+            outcomes[index] = _row_error(row, e)
+    missing = [index for index, outcome in enumerate(outcomes) if outcome is None]
+
+    if len(missing) == len(rows):
+        # Nothing usable came back: split in half so one bad row cannot sink the batch.
+        middle = len(rows) // 2
+        return (_generate_batch(rows[:middle], model, resolved)
+                + _generate_batch(rows[middle:], model, resolved))
+    if missing:
+        retried = _generate_batch([rows[index] for index in missing], model, resolved)
+        for index, outcome in zip(missing, retried):
+            outcomes[index] = outcome
+    return outcomes
+
+
+def _generate_single(row, model, resolved):
+    """Single-candidate request returning (triple, fully_valid); used when a batch is split down to one row."""
+    response = None
+    try:
+        response = _call_structured(model, _prompt_for(row, resolved))
+        return _finish_summaries(row, extract_json(response.text), model, resolved)
+    except Exception as e:
+        raise _row_error(row, e, raw=response.text if response is not None else 'N/A') from e
+
+
+def generate_summaries_for_batch(rows, model, cache=None, resolved=False, retry_imperfect=False):
+    """Generates summaries for several candidates with as few requests as possible.
+
+    Returns a list with, per row, either a (200, 150, 100) tuple or a
+    SummaryGenerationError. Cached rows are served locally; the rest go out
+    in one request, and a malformed or incomplete response is split and
+    retried until each row succeeds or fails on its own. Accepted rows are
+    cached as in `generate_summaries_for_candidate`.
+    """
+    outcomes = [None] * len(rows)
+    keys = [None] * len(rows)
+    if cache is not None:
+        model_name = model_name_of(model)
+        for index, row in enumerate(rows):
+            try:
+                keys[index] = cache_key(_prompt_for(row, resolved), model_name)
+            except Exception as e:
+                outcomes[index] = _row_error(row, e)
+                continue
+            outcomes[index] = cache.get(keys[index])
+
+    pending = [index for index, outcome in enumerate(outcomes) if outcome is None]
+    if pending:
+        generated = _generate_batch([rows[index] for index in pending], model, resolved)
+        for index, outcome in zip(pending, generated):
+            if isinstance(outcome, Exception):
+                outcomes[index] = outcome
+                continue
+            outcomes[index], valid = outcome
+            if cache is not None and (valid or not retry_imperfect):
+                cache.put(keys[index], outcomes[index])
+    return outcomes
+
+
+# --- Run Orchestration (shared by app.py and cli.py) ---
+
+def prepare_rows(df, mode=MODE_FULL):
+    """Turns a candidates DataFrame into the row objects the selected mode expects."""
+    prepared = add_bands(df) if mode != MODE_FULL else df
+    return [row for _, row in prepared.iterrows()]
+
+
+def group_by_signature(rows):
+    """Groups prepared rows by `scoring.band_signature`; returns lists of row positions."""
+    groups = {}
+    for position, row in enumerate(rows):
+        groups.setdefault(band_signature(row), []).append(position)
+    return list(groups.values())
+
+
+def signature_report(groups):
+    """Group-size statistics and the API calls saved by signature sharing."""
+    sizes = sorted((len(group) for group in groups), reverse=True)
+    rows = sum(sizes)
+    distribution = {}
+    for size in sizes:
+        distribution[size] = distribution.get(size, 0) + 1
+    return {
+        'rows': rows,
+        'groups': len(sizes),
+        'calls_saved': rows - len(sizes),
+        'savings_pct': round((rows - len(sizes)) / rows * 100, 1) if rows else 0.0,
+        'largest_group': sizes[0] if sizes else 0,
+        'group_sizes': distribution,
+    }
+
+
+def _run_model(rows, model, resolved, batch_size, max_workers, cache, on_result, metrics):
+    if batch_size > 1:
+        batch_worker = partial(generate_summaries_for_batch, model=model, cache=cache, resolved=resolved)
+        return run_batches(rows, batch_worker, batch_size, max_workers=max_workers, on_result=on_result,
+                           group_key=lambda row: str(row['Level']).strip().upper(), metrics=metrics)
+    worker = partial(generate_summaries_for_candidate, model=model, cache=cache, resolved=resolved)
+    return run_batch(rows, worker, max_workers=max_workers, on_result=on_result, metrics=metrics)
+
+
+def _generate_by_signature(rows, model, batch_size, max_workers, cache, on_result, metrics):
+    """Generates one resolved-mode summary per band-signature group under
+    PLACEHOLDER_NAME and hands every member a copy carrying their own name."""
+    groups = group_by_signature(rows)
+    representatives = []
+    for group in groups:
+        representative = rows[group[0]].copy()
+        representative['Name'] = PLACEHOLDER_NAME
+        representatives.append(representative)
+    results = [None] * len(rows)
+    completed = [0]
+
+    def fan_out(_, __, group_result):
+        for position in groups[group_result.position]:
+            name = rows[position]['Name']
+            if group_result.error:
+                result = RowResult(position, group_result.summaries, substitute_name(group_result.error, name),
+                                   group_result.reason)
+            else:
+                result = RowResult(position, tuple(substitute_name(text, name) for text in group_result.summaries))
+            results[position] = result
+            completed[0] += 1
+            if on_result is not None:
+                on_result(completed[0], len(rows), result)
+
+    group_results = _run_model(representatives, model, True, batch_size, max_workers, cache, fan_out, metrics)
+    if metrics is not None:
+        # The engine counted one row per group; add the members that shared it.
+        shared = sum(len(group) - 1 for group in groups)
+        shared_failed = sum(len(group) - 1 for group, result in zip(groups, group_results) if result.error)
+        metrics.record_rows(shared, None, failed=shared_failed)
+    return results
+
+
+def generate_rows(rows, model=None, mode=MODE_FULL, batch_size=1, max_workers=4, rate_limiter=None,
+                  retry_policy=None, breaker=None, cache=None, on_result=None, metrics=None):
+    """Generates summaries for prepared rows with the selected mode.
+
+    Model calls go through a ResilientModel, so they are rate limited,
+    retried with backoff on retryable errors and paused by `breaker` when
+    the provider is overloaded (pass an already wrapped model to share its
+    counters and metrics). In signature mode, rows with the same band
+    signature share one request (see `signature_report`). Returns
+    engine.RowResult objects in input order; `on_result` is called from the
+    calling thread as each row completes.
+    """
+    if mode == MODE_TEMPLATE:
+        return run_batch(rows, template_summaries, max_workers=max_workers, on_result=on_result, metrics=metrics)
+    if not isinstance(model, ResilientModel):
+        model = ResilientModel(model, rate_limiter=rate_limiter, retry_policy=retry_policy or RetryPolicy(),
+                               breaker=breaker or CircuitBreaker(), metrics=metrics)
+    if mode == MODE_SIGNATURE:
+        return _generate_by_signature(rows, model, batch_size, max_workers, cache, on_result, metrics)
+    return _run_model(rows, model, mode == MODE_RESOLVED, batch_size, max_workers, cache, on_result, metrics)
+
+
+def build_results_df(df, summaries_by_row, failures_by_row=None):
+    """Appends the summary and failure-reason columns to `df`; rows without results stay empty."""
+    failures_by_row = failures_by_row or {}
+    results_df = pd.DataFrame(
+        [summaries_by_row.get(position, (None, None, None)) for position in range(len(df))],
+        columns=SUMMARY_COLUMNS,
+    )
+    results_df[FAILURE_COLUMN] = [failures_by_row.get(position, '') for position in range(len(df))]
+    return pd.concat([df.reset_index(drop=True), results_df], axis=1)
+
+
+def failed_positions(results_df):
+    """Row positions of a `build_results_df` frame that carry a failure reason."""
+    failures = results_df[FAILURE_COLUMN].fillna('').astype(str).str.len() > 0
+    return list(failures[failures].index)
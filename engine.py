@@ -0,0 +1,167 @@
+# engine.py
+# Concurrent batch execution: a bounded worker pool plus a client-side
+# requests-per-minute / tokens-per-minute limiter.
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from resilience import classify_error
+
+WINDOW_SECONDS = 60.0
+
+
+class RateLimiter:
+    """Sliding one-minute window limiter for requests and (estimated) tokens.
+
+    A limit of None or 0 disables that budget. `acquire` blocks the calling
+    worker until the request fits inside both budgets.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, clock=time.monotonic, sleep=time.sleep):
+        self.requests_per_minute = requests_per_minute or None
+        self.tokens_per_minute = tokens_per_minute or None
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._events = deque()  # (timestamp, tokens)
+        self._tokens_in_window = 0
+
+    def _expire(self, now):
+        while self._events and now - self._events[0][0] >= WINDOW_SECONDS:
+            _, tokens = self._events.popleft()
+            self._tokens_in_window -= tokens
+
+    def _wait_time(self, now, tokens):
+        """Seconds until a request of `tokens` fits, or 0 if it fits now."""
+        waits = [0.0]
+        if self.requests_per_minute and len(self._events) >= self.requests_per_minute:
+            oldest = self._events[len(self._events) - self.requests_per_minute][0]
+            waits.append(oldest + WINDOW_SECONDS - now)
+        if self.tokens_per_minute and self._events:
+            # A single request larger than the whole budget is let through on an empty window.
+            excess = self._tokens_in_window + tokens - self.tokens_per_minute
+            for timestamp, event_tokens in self._events:
+                if excess <= 0:
+                    break
+                excess -= event_tokens
+                waits.append(timestamp + WINDOW_SECONDS - now)
+        return max(waits)
+
+    def acquire(self, tokens=0):
+        if not (self.requests_per_minute or self.tokens_per_minute):
+            return
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._expire(now)
+                wait = self._wait_time(now, tokens)
+                if wait <= 0:
+                    self._events.append((now, tokens))
+                    self._tokens_in_window += tokens
+                    return
+            self._sleep(wait)
+
+
+@dataclass
+class RowResult:
+    """Outcome of one row: the (200, 150, 100) summaries or an error message
+    plus its failure reason (see resilience.py)."""
+    position: int
+    summaries: tuple
+    error: str = None
+    reason: str = None
+
+    @property
+    def failure(self):
+        """Short text for the failure-reason column; empty on success."""
+        if not self.error:
+            return ''
+        message = self.error if len(self.error) <= 300 else self.error[:297] + '...'
+        return f"{self.reason}: {message}"
+
+
+ERROR_SUMMARIES = ("Error", "Error", "Error")
+
+
+def run_batch(rows, worker, max_workers=4, on_result=None, metrics=None):
+    """Runs `worker(row)` for every row on a bounded thread pool.
+
+    Returns a list of RowResult in the same order as `rows`. `on_result`
+    is called from the calling thread as each row completes, with
+    (completed_count, total, RowResult), so it is safe to update Streamlit
+    widgets from it.
+    """
+    def batch_worker(batch):
+        try:
+            return [worker(batch[0])]
+        except Exception as e:
+            return [e]
+
+    return run_batches(rows, batch_worker, batch_size=1, max_workers=max_workers, on_result=on_result,
+                       metrics=metrics)
+
+
+def make_batches(rows, batch_size, group_key=None):
+    """Splits row positions into batches of at most `batch_size`.
+
+    When `group_key(row)` is given, only rows with equal keys share a batch.
+    Batches keep the input order within each group.
+    """
+    groups = {}
+    for position, row in enumerate(rows):
+        groups.setdefault(group_key(row) if group_key is not None else None, []).append(position)
+    batch_size = max(1, batch_size)
+    return [
+        positions[start:start + batch_size]
+        for positions in groups.values()
+        for start in range(0, len(positions), batch_size)
+    ]
+
+
+def run_batches(rows, batch_worker, batch_size, max_workers=4, on_result=None, group_key=None, metrics=None):
+    """Runs `batch_worker(list_of_rows)` over batches of rows on a bounded thread pool.
+
+    `batch_worker` returns one outcome per row: a summaries tuple or an
+    Exception. Results come back as RowResult in input order, and
+    `on_result` fires per row as in `run_batch`. With a metrics.RunMetrics,
+    the time each batch waited in the pool queue and its row outcomes are
+    recorded.
+    """
+    rows = list(rows)
+    total = len(rows)
+    results = [None] * total
+    if total == 0:
+        return results
+
+    def timed_worker(batch, submitted):
+        queue_wait = time.monotonic() - submitted
+        try:
+            return queue_wait, batch_worker(batch)
+        except Exception as e:
+            return queue_wait, [e] * len(batch)
+
+    batches = make_batches(rows, batch_size, group_key)
+    completed = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as pool:
+        futures = {
+            pool.submit(timed_worker, [rows[position] for position in batch], time.monotonic()): batch
+            for batch in batches
+        }
+        for future in as_completed(futures):
+            positions = futures[future]
+            queue_wait, outcomes = future.result()
+            if metrics is not None:
+                metrics.record_rows(len(positions), queue_wait,
+                                    failed=sum(isinstance(outcome, Exception) for outcome in outcomes))
+            for position, outcome in zip(positions, outcomes):
+                if isinstance(outcome, Exception):
+                    result = RowResult(position, ERROR_SUMMARIES, str(outcome), classify_error(outcome))
+                else:
+                    result = RowResult(position, tuple(outcome))
+                results[position] = result
+                completed += 1
+                if on_result is not None:
+                    on_result(completed, total, result)
+    return results
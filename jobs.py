@@ -0,0 +1,327 @@
+# jobs.py
+# Local background job queue so generation outlives the Streamlit session
+# that started it. Jobs, their inputs and their results live on disk; one
+# JobRunner per server process works through them with a shared worker
+# budget, scheduling fairly between owners (browser sessions).
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+from cache import SummaryCache
+from checkpoint import RunCheckpoint
+from core import MODE_TEMPLATE, build_results_df, generate_rows, prepare_rows
+from engine import RateLimiter
+from metrics import RunMetrics
+from preflight import validate_cohort
+from resilience import CircuitBreaker, ResilientModel, RetryPolicy, make_hedge_policy
+from streaming import dataframe_to_xlsx_bytes, read_upload
+
+DEFAULT_JOB_DIR = ".summary_jobs"
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED)
+
+DEFAULT_SETTINGS = {
+    "mode": "full",
+    "batch_size": 1,
+    "max_workers": 4,
+    "max_attempts": 4,
+    "bypass_cache": False,
+    "deadline": 300,
+    "hedge_percentile": None,
+    "hedge_budget": 0.1,
+}
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+_COLUMNS = ("id", "owner", "file_name", "status", "settings", "total", "completed", "failed",
+            "error", "metrics", "created", "started", "finished")
+
+
+class JobStore:
+    """SQLite table of jobs plus a directory per job holding the uploaded
+    file, results.xlsx and its row checkpoint. Safe to share between threads and
+    between Streamlit sessions of one server."""
+
+    def __init__(self, directory=DEFAULT_JOB_DIR):
+        self.directory = directory
+        self.path = os.path.join(directory, "jobs.sqlite3")
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " owner TEXT NOT NULL,"
+                " file_name TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " settings TEXT NOT NULL,"
+                " total INTEGER NOT NULL DEFAULT 0,"
+                " completed INTEGER NOT NULL DEFAULT 0,"
+                " failed INTEGER NOT NULL DEFAULT 0,"
+                " error TEXT,"
+                " metrics TEXT,"
+                " created REAL NOT NULL,"
+                " started REAL,"
+                " finished REAL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def job_dir(self, job_id):
+        return os.path.join(self.directory, job_id)
+
+    def input_path(self, job_id, file_name):
+        """Where the upload is kept; the original extension selects the reader."""
+        return os.path.join(self.job_dir(job_id), "input" + os.path.splitext(file_name)[1].lower())
+
+    def result_path(self, job_id):
+        return os.path.join(self.job_dir(job_id), "results.xlsx")
+
+    def submit(self, owner, file_name, content, total, settings=None):
+        """Stores the uploaded file and queues a job for it; returns the job id.
+
+        `total` is the number of rows that will be generated (the valid rows).
+        """
+        job_id = uuid.uuid4().hex[:12]
+        os.makedirs(self.job_dir(job_id), exist_ok=True)
+        with open(self.input_path(job_id, file_name), "wb") as handle:
+            handle.write(content)
+        settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, owner, file_name, status, settings, total, created) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, owner, file_name, STATUS_QUEUED, json.dumps(settings), int(total), time.time()),
+            )
+        return job_id
+
+    def get(self, job_id):
+        """The job as a dict (settings and metrics decoded), or None if unknown."""
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job(row) if row is not None else None
+
+    def list_jobs(self, owner=None, limit=50):
+        """Most recent jobs first, optionally only those of `owner`."""
+        query = f"SELECT {', '.join(_COLUMNS)} FROM jobs"
+        params = ()
+        if owner is not None:
+            query += " WHERE owner = ?"
+            params = (owner,)
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY created DESC LIMIT ?", params + (limit,)).fetchall()
+        return [_job(row) for row in rows]
+
+    def queue_position(self, job_id):
+        """Number of queued jobs submitted before `job_id` (0 = next up)."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND created < (SELECT created FROM jobs WHERE id = ?)",
+                (STATUS_QUEUED, job_id),
+            ).fetchone()
+        return row[0]
+
+    def claim_next(self):
+        """Marks the next job as running and returns it, or None when the queue is empty.
+
+        Fair scheduling: among queued jobs, the owner with the fewest running
+        jobs goes first, so one assessor's backlog cannot starve another's
+        upload; ties go to the oldest job.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f"SELECT {', '.join('q.' + column for column in _COLUMNS)} FROM jobs q"
+                " WHERE q.status = ?"
+                " ORDER BY (SELECT COUNT(*) FROM jobs r WHERE r.owner = q.owner AND r.status = ?), q.created"
+                " LIMIT 1",
+                (STATUS_QUEUED, STATUS_RUNNING),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE jobs SET status = ?, started = ? WHERE id = ?", (STATUS_RUNNING, time.time(), row[0]))
+        job = _job(row)
+        job["status"] = STATUS_RUNNING
+        return job
+
+    def update_progress(self, job_id, completed, failed):
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET completed = ?, failed = ? WHERE id = ?", (completed, failed, job_id))
+
+    def finish(self, job_id, status, error=None, metrics=None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, metrics = ?, finished = ? WHERE id = ?",
+                (status, error, json.dumps(metrics) if metrics is not None else None, time.time(), job_id),
+            )
+
+    def requeue_running(self):
+        """Puts jobs left running by a stopped server back in the queue; their checkpoints let them resume."""
+        with self._connect() as conn:
+            return conn.execute("UPDATE jobs SET status = ? WHERE status = ?", (STATUS_QUEUED, STATUS_RUNNING)).rowcount
+
+    def results(self, job_id):
+        """The finished job's results workbook as bytes, or None if there is none yet."""
+        path = self.result_path(job_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as handle:
+            return handle.read()
+
+
+def _job(row):
+    job = dict(zip(_COLUMNS, row))
+    job["settings"] = json.loads(job["settings"])
+    job["metrics"] = json.loads(job["metrics"]) if job["metrics"] else None
+    return job
+
+
+class JobRunner:
+    """Processes queued jobs on background threads.
+
+    At most `max_running_jobs` run at once and they split `total_workers`
+    concurrent requests between them, so a new job is not stuck behind a
+    large one for the full duration. `model` is shared by all jobs (it must
+    be thread-safe, as backends.GeminiBackend is); it may be None when only
+    template-mode jobs are expected. Every job's requests also go through
+    the same `rate_limiter` and `breaker`, so concurrent jobs together stay
+    within one API key's quota and back off together on overload. Call
+    `start()` once per process.
+    """
+
+    def __init__(self, store, model=None, rate_limiter=None, breaker=None, max_running_jobs=2, total_workers=16,
+                 poll_interval=1.0):
+        self.store = store
+        self.model = model
+        self.rate_limiter = rate_limiter or RateLimiter(60)
+        self.breaker = breaker or CircuitBreaker()
+        self.max_running_jobs = max(1, max_running_jobs)
+        self.total_workers = max(1, total_workers)
+        self.poll_interval = poll_interval
+        self._running = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self.store.requeue_running()
+            self._thread = threading.Thread(target=self._dispatch, name="job-dispatcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def notify(self):
+        """Wakes the dispatcher after a submit instead of waiting for the next poll."""
+        self._wake.set()
+
+    def running_jobs(self):
+        with self._lock:
+            return list(self._running)
+
+    def _dispatch(self):
+        while True:
+            with self._lock:
+                free = self.max_running_jobs - len(self._running)
+            while free > 0:
+                try:
+                    job = self.store.claim_next()
+                except sqlite3.Error:
+                    break
+                if job is None:
+                    break
+                thread = threading.Thread(target=self._run, args=(job,), name=f"job-{job['id']}", daemon=True)
+                with self._lock:
+                    self._running[job["id"]] = thread
+                thread.start()
+                free -= 1
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _run(self, job):
+        try:
+            self.run_job(job)
+        except Exception as e:
+            self.store.finish(job["id"], STATUS_FAILED, error=str(e))
+        finally:
+            with self._lock:
+                self._running.pop(job["id"], None)
+            self._wake.set()
+
+    def run_job(self, job):
+        """Generates every valid row of `job`, resuming from its checkpoint, and writes results.xlsx.
+
+        Rows failing pre-flight validation are not sent; they appear in the
+        results with their validation errors as the failure reason.
+        """
+        settings = job["settings"]
+        mode = settings["mode"]
+        if self.model is None and mode != MODE_TEMPLATE:
+            raise RuntimeError("No model is configured for this server; only template mode can run.")
+        with open(self.store.input_path(job["id"], job["file_name"]), "rb") as handle:
+            preflight = validate_cohort(read_upload(job["file_name"], handle.read()))
+        if preflight.missing_columns:
+            raise ValueError(f"Missing required columns: {', '.join(preflight.missing_columns)}")
+        df = preflight.cleaned
+        checkpoint = RunCheckpoint(job["id"], directory=self.store.job_dir(job["id"]))
+        summaries_by_row = checkpoint.load()
+        failures_by_row = {}
+        positions = [position for position in preflight.valid_positions if position not in summaries_by_row]
+
+        metrics = RunMetrics(getattr(self.model, "model_name", None))
+        workers = min(settings["max_workers"], max(1, self.total_workers // self.max_running_jobs))
+        client = ResilientModel(
+            self.model,
+            rate_limiter=self.rate_limiter,
+            retry_policy=RetryPolicy(max_attempts=settings["max_attempts"]),
+            breaker=self.breaker,
+            metrics=metrics,
+            hedge_policy=make_hedge_policy(settings["hedge_percentile"], settings["deadline"],
+                                           settings["hedge_budget"]),
+            max_workers=workers,
+        )
+        last_update = [0.0]
+
+        def on_result(completed, total, result):
+            position = positions[result.position]
+            summaries_by_row[position] = result.summaries
+            if result.error:
+                failures_by_row[position] = result.failure
+            else:
+                checkpoint.append(position, result.summaries)
+            if time.monotonic() - last_update[0] >= PROGRESS_INTERVAL_SECONDS or completed == total:
+                self.store.update_progress(job["id"], len(summaries_by_row), len(failures_by_row))
+                last_update[0] = time.monotonic()
+
+        all_rows = prepare_rows(df, mode)
+        generate_rows(
+            [all_rows[position] for position in positions], model=client, mode=mode,
+            batch_size=settings["batch_size"], max_workers=workers,
+            cache=SummaryCache(bypass=settings["bypass_cache"]), on_result=on_result, metrics=metrics,
+        )
+        metrics.finish()
+
+        results_df = build_results_df(df, summaries_by_row, {**preflight.failures(), **failures_by_row})
+        with open(self.store.result_path(job["id"]), "wb") as handle:
+            handle.write(dataframe_to_xlsx_bytes(results_df, sheet_name="Generated_Summaries"))
+        self.store.update_progress(job["id"], len(summaries_by_row), len(failures_by_row))
+        self.store.finish(job["id"], STATUS_DONE, metrics=metrics.summary())
+
+
+def results_frame(content):
+    """Reads a results workbook returned by `JobStore.results` back into a DataFrame."""
+    return pd.read_excel(io.BytesIO(content))
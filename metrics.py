@@ -0,0 +1,157 @@
+# metrics.py
+# Per-call and per-run instrumentation: latency, queue wait, retries, token
+# usage, throughput and estimated cost, exportable as JSON or CSV.
+import csv
+import io
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from prompts import estimate_tokens
+
+# USD per million tokens: (input, output, context-cached input). Thinking
+# tokens are billed as output; cache storage (per token-hour) is not included.
+PRICING_PER_MILLION = {
+    'gemini-2.5-pro': (1.25, 10.00, 0.31),
+    'gemini-2.5-flash': (0.30, 2.50, 0.075),
+}
+
+
+@dataclass
+class CallRecord:
+    """One `generate_content` call as seen by ResilientModel."""
+    started: float        # seconds since the run started
+    latency: float        # seconds spent in the final attempt
+    wait: float           # seconds blocked on the rate limiter, circuit breaker and backoff
+    retries: int
+    prompt_tokens: int
+    output_tokens: int
+    tokens_estimated: bool
+    reason: str = ''      # failure reason, empty on success
+    hedged: bool = False  # a duplicate request was sent (tokens count both)
+    hedge_won: bool = False
+    unhedged_latency: float = None  # hedged calls: how long the primary request took
+    cached_tokens: int = 0  # prompt tokens served from the context cache (part of prompt_tokens)
+
+
+def usage_tokens(response, prompt):
+    """(prompt_tokens, output_tokens, cached_tokens, estimated) from `usage_metadata`, or local estimates."""
+    usage = getattr(response, 'usage_metadata', None)
+    prompt_tokens = getattr(usage, 'prompt_token_count', None) if usage is not None else None
+    if prompt_tokens:
+        output_tokens = ((getattr(usage, 'candidates_token_count', 0) or 0)
+                         + (getattr(usage, 'thoughts_token_count', 0) or 0))
+        return prompt_tokens, output_tokens, getattr(usage, 'cached_content_token_count', 0) or 0, False
+    try:
+        text = response.text
+    except Exception:
+        text = ''
+    return estimate_tokens(prompt), estimate_tokens(text) if text else 0, 0, True
+
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)), 3) if values else None
+
+
+class RunMetrics:
+    """Thread-safe collector for one generation run."""
+
+    def __init__(self, model_name=None, clock=time.monotonic):
+        self.model_name = (model_name or '').split('/')[-1]
+        self.calls = []
+        self.rows = 0
+        self.failed_rows = 0
+        self.queue_waits = []
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.started = clock()
+        self.finished = None
+
+    def record_call(self, record):
+        with self._lock:
+            self.calls.append(record)
+
+    def record_rows(self, count, queue_wait, failed=0):
+        """Rows completed by one worker task, after waiting `queue_wait` seconds in the pool queue.
+
+        `queue_wait` is None for rows that were completed without a task of
+        their own (e.g. members sharing a band-signature summary).
+        """
+        with self._lock:
+            self.rows += count
+            self.failed_rows += failed
+            if queue_wait is not None:
+                self.queue_waits.append(queue_wait)
+
+    def finish(self):
+        self.finished = self._clock()
+
+    def estimated_cost(self, prompt_tokens, output_tokens, cached_tokens=0):
+        prices = PRICING_PER_MILLION.get(self.model_name)
+        if prices is None:
+            return None
+        input_cost = (prompt_tokens - cached_tokens) * prices[0] + cached_tokens * prices[2]
+        return round((input_cost + output_tokens * prices[1]) / 1_000_000, 4)
+
+    def summary(self):
+        """Aggregated run statistics as a flat, JSON-friendly dict."""
+        with self._lock:
+            calls = list(self.calls)
+            rows, failed_rows, queue_waits = self.rows, self.failed_rows, list(self.queue_waits)
+        elapsed = (self.finished or self._clock()) - self.started
+        latencies = [call.latency for call in calls]
+        hedged = [call for call in calls if call.hedged]
+        prompt_tokens = sum(call.prompt_tokens for call in calls)
+        output_tokens = sum(call.output_tokens for call in calls)
+        cached_tokens = sum(call.cached_tokens for call in calls)
+        cost = self.estimated_cost(prompt_tokens, output_tokens, cached_tokens)
+        return {
+            'model': self.model_name,
+            'rows': rows,
+            'failed_rows': failed_rows,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_minute': round(rows / elapsed * 60, 2) if elapsed > 0 else None,
+            'calls': len(calls),
+            'failed_calls': sum(1 for call in calls if call.reason),
+            'retries': sum(call.retries for call in calls),
+            'latency_p50': percentile(latencies, 50),
+            'latency_p95': percentile(latencies, 95),
+            'latency_p99': percentile(latencies, 99),
+            'latency_p99_unhedged': percentile([self._unhedged_latency(call) for call in calls], 99),
+            'hedges_issued': len(hedged),
+            'hedges_won': sum(1 for call in hedged if call.hedge_won),
+            'hedge_extra_requests_pct': round(len(hedged) / len(calls) * 100, 1) if calls else 0.0,
+            'call_wait_p95': percentile([call.wait for call in calls], 95),
+            'queue_wait_p95': percentile(queue_waits, 95),
+            'prompt_tokens': prompt_tokens,
+            'output_tokens': output_tokens,
+            'cached_prompt_tokens': cached_tokens,
+            'cached_prompt_pct': round(cached_tokens / prompt_tokens * 100, 1) if prompt_tokens else 0.0,
+            'tokens_estimated': any(call.tokens_estimated for call in calls),
+            'tokens_per_candidate': round((prompt_tokens + output_tokens) / rows, 1) if rows else None,
+            'estimated_cost_usd': cost,
+            'cost_per_candidate_usd': round(cost / rows, 5) if cost is not None and rows else None,
+        }
+
+    def _unhedged_latency(self, call):
+        """What the call would have taken without hedging. A primary request
+        still in flight counts with the time it has been running so far."""
+        if not call.hedged:
+            return call.latency
+        if call.unhedged_latency is not None:
+            return call.unhedged_latency
+        return max(call.latency, self._clock() - self.started - call.started - call.wait)
+
+    def to_json(self):
+        return json.dumps({'summary': self.summary(), 'calls': [asdict(call) for call in self.calls]}, indent=2)
+
+    def calls_csv(self):
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=list(CallRecord.__dataclass_fields__))
+        writer.writeheader()
+        for call in self.calls:
+            writer.writerow(asdict(call))
+        return output.getvalue()
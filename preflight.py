@@ -0,0 +1,116 @@
+# preflight.py
+# Whole-cohort validation before any API call: schema, score dtypes and
+# ranges, allowed Level/Gender values and duplicate names, checked column by
+# column on the full DataFrame instead of failing row by row mid-run.
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from core import CANDIDATE_COLUMNS, GENDERS, LEVEL_NAMES
+from resilience import INVALID_INPUT
+from scoring import ALL_COMPETENCIES
+
+SCORE_RANGE = (1.0, 5.0)
+ERRORS_COLUMN = 'Validation Errors'
+
+
+@dataclass
+class PreflightReport:
+    """Outcome of `validate_cohort`.
+
+    `row_errors` holds one '; '-joined message per row ('' when the row is
+    valid); `cleaned` is the input with scores converted to floats and
+    Level/Gender stripped, ready for `core.prepare_rows`.
+    """
+    missing_columns: list
+    row_errors: pd.Series
+    cleaned: pd.DataFrame
+
+    @property
+    def valid_mask(self):
+        return self.row_errors.eq('')
+
+    @property
+    def valid_positions(self):
+        return list(np.flatnonzero(self.valid_mask.to_numpy()))
+
+    @property
+    def invalid_count(self):
+        return int((~self.valid_mask).sum())
+
+    @property
+    def ok(self):
+        return not self.missing_columns and self.invalid_count == 0
+
+    def failures(self):
+        """{row position: failure text} for invalid rows, in the core.FAILURE_COLUMN format."""
+        invalid = self.row_errors[~self.valid_mask]
+        return {int(position): f"{INVALID_INPUT}: {message}" for position, message in invalid.items()}
+
+    def valid_rows(self):
+        """The cleaned valid rows only, re-indexed from 0."""
+        return self.cleaned[self.valid_mask].reset_index(drop=True)
+
+    def error_report(self):
+        """Invalid rows with their spreadsheet row number (header = row 1) and problems."""
+        invalid = ~self.valid_mask
+        report = self.cleaned[invalid].copy()
+        report.insert(0, ERRORS_COLUMN, self.row_errors[invalid])
+        report.insert(0, 'Sheet Row', np.flatnonzero(invalid.to_numpy()) + 2)
+        return report.reset_index(drop=True)
+
+
+def validate_cohort(df):
+    """Validates every row of a candidates DataFrame in one vectorized pass.
+
+    A missing required column makes every row invalid; otherwise each row
+    is checked independently, so the valid rows can still be generated.
+    """
+    df = df.reset_index(drop=True)
+    missing = [column for column in CANDIDATE_COLUMNS if column not in df.columns]
+    cleaned = df.copy()
+    # (boolean mask over rows, message) pairs; a message may also be a per-row array.
+    checks = []
+    if missing:
+        checks.append((np.ones(len(df), dtype=bool), f"missing columns: {', '.join(missing)}"))
+
+    if 'Name' in df.columns:
+        names = df['Name'].astype('string').str.strip()
+        blank = names.isna() | names.eq('')
+        checks.append((blank.to_numpy(dtype=bool), "Name is empty"))
+        normalized = names.str.casefold()
+        duplicate = (normalized.duplicated(keep='first') & ~blank).to_numpy(dtype=bool)
+        first_row = pd.Series(df.index, index=df.index).groupby(normalized).transform('min') + 2
+        checks.append((duplicate, np.array([f"duplicate Name (first seen on sheet row {row})" for row in
+                                            first_row.to_numpy()[duplicate].astype(int)], dtype=object)))
+
+    for column, allowed in (('Level', LEVEL_NAMES), ('Gender', GENDERS)):
+        if column not in df.columns:
+            continue
+        values = df[column].astype('string').str.strip()
+        cleaned[column] = values.astype(object)
+        known = values.str.upper().isin([value.upper() for value in allowed]).fillna(False)
+        checks.append((~known.to_numpy(dtype=bool), f"{column} must be one of {', '.join(allowed)}"))
+
+    low, high = SCORE_RANGE
+    for column in ALL_COMPETENCIES:
+        if column not in df.columns:
+            continue
+        scores = pd.to_numeric(df[column], errors='coerce')
+        cleaned[column] = scores.astype(float)
+        absent = df[column].isna()
+        if not pd.api.types.is_numeric_dtype(df[column]):
+            absent |= df[column].astype('string').str.strip().eq('').fillna(False)
+        checks.append((absent.to_numpy(dtype=bool), f"{column} is missing"))
+        checks.append(((scores.isna() & ~absent).to_numpy(dtype=bool), f"{column} is not a number"))
+        checks.append((((scores < low) | (scores > high)).to_numpy(dtype=bool),
+                       f"{column} is outside {low:.2f}-{high:.2f}"))
+
+    # Messages are only assembled for rows that failed at least one check.
+    messages = [[] for _ in range(len(df))]
+    for mask, message in checks:
+        for index, position in enumerate(np.flatnonzero(mask)):
+            messages[position].append(message if isinstance(message, str) else message[index])
+    row_errors = pd.Series(['; '.join(items) for items in messages], index=df.index, dtype=object)
+    return PreflightReport(missing, row_errors, cleaned)
@@ -0,0 +1,406 @@
+# resilience.py
+# Failure classification, jittered exponential backoff, a circuit breaker,
+# per-call deadlines and hedged requests around model calls.
+import inspect
+import json
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from metrics import CallRecord, usage_tokens
+from prompts import estimate_tokens
+from validator import extract_json
+
+# Failure reasons recorded per row.
+RATE_LIMITED = "rate_limited"
+UNAVAILABLE = "unavailable"
+TIMEOUT = "timeout"
+INVALID_OUTPUT = "invalid_output"
+BLOCKED = "blocked"
+INVALID_INPUT = "invalid_input"
+CLIENT_ERROR = "client_error"
+UNKNOWN = "unknown"
+
+ALL_REASONS = frozenset({
+    RATE_LIMITED, UNAVAILABLE, TIMEOUT, INVALID_OUTPUT, BLOCKED, INVALID_INPUT, CLIENT_ERROR, UNKNOWN,
+})
+RETRYABLE_REASONS = frozenset({RATE_LIMITED, UNAVAILABLE, TIMEOUT})
+OVERLOAD_REASONS = frozenset({RATE_LIMITED, UNAVAILABLE})
+
+_NAME_REASONS = {
+    "ResourceExhausted": RATE_LIMITED,
+    "TooManyRequests": RATE_LIMITED,
+    "ServiceUnavailable": UNAVAILABLE,
+    "InternalServerError": UNAVAILABLE,
+    "BadGateway": UNAVAILABLE,
+    "DeadlineExceeded": TIMEOUT,
+    "GatewayTimeout": TIMEOUT,
+    "InvalidArgument": CLIENT_ERROR,
+    "PermissionDenied": CLIENT_ERROR,
+    "Unauthenticated": CLIENT_ERROR,
+    "NotFound": CLIENT_ERROR,
+    "BlockedPromptException": BLOCKED,
+    "StopCandidateException": BLOCKED,
+}
+
+
+def classify_error(error):
+    """Maps an exception to one of the failure reasons above.
+
+    Works on google.api_core exceptions by class name and HTTP `code`, so the
+    classification does not depend on a particular client library version.
+    """
+    reason = getattr(error, "reason", None)
+    if reason in ALL_REASONS:
+        return reason
+    for cls in type(error).__mro__:
+        if cls.__name__ in _NAME_REASONS:
+            return _NAME_REASONS[cls.__name__]
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        if code == 429:
+            return RATE_LIMITED
+        if code in (500, 502, 503):
+            return UNAVAILABLE
+        if code == 504:
+            return TIMEOUT
+        if 400 <= code < 500:
+            return CLIENT_ERROR
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return TIMEOUT if isinstance(error, TimeoutError) else UNAVAILABLE
+    if isinstance(error, json.JSONDecodeError):
+        return INVALID_OUTPUT
+    if isinstance(error, KeyError):
+        return INVALID_INPUT
+    if isinstance(error, ValueError) and "response.text" in str(error):
+        # The SDK's `.text` accessor raises ValueError when the candidate was blocked.
+        return BLOCKED
+    if isinstance(error, (ValueError, TypeError)):
+        return INVALID_OUTPUT
+    return UNKNOWN
+
+
+def accepts_argument(model, name):
+    """True when `model.generate_content` takes a keyword argument called `name`."""
+    try:
+        parameters = inspect.signature(model.generate_content).parameters
+    except (AttributeError, TypeError, ValueError):
+        return False
+    return name in parameters
+
+
+def accepts_generation_config(model):
+    """True when `model.generate_content` takes a `generation_config` argument
+    (genai.GenerativeModel does; simple fakes usually do not)."""
+    return accepts_argument(model, "generation_config")
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter: sleep ~ U(0, min(max_delay, base * 2**attempt))."""
+
+    def __init__(self, max_attempts=4, base_delay=1.0, max_delay=60.0, rng=None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+
+    def delay(self, attempt):
+        """Backoff before retry number `attempt` (1 for the first retry)."""
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Pauses every worker after repeated overload errors from the provider.
+
+    After `failure_threshold` consecutive rate-limit/unavailable errors the
+    breaker opens for `cooldown` seconds; `wait()` blocks callers until it
+    closes again. Any success resets the count.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=30.0, clock=time.monotonic, sleep=time.sleep):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.trips = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+
+    def wait(self):
+        while True:
+            with self._lock:
+                remaining = self._open_until - self._clock()
+            if remaining <= 0:
+                return
+            self._sleep(remaining)
+
+    def is_open(self):
+        with self._lock:
+            return self._clock() < self._open_until
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+
+    def record_failure(self, reason):
+        if reason not in OVERLOAD_REASONS:
+            return
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.failure_threshold and self._clock() >= self._open_until:
+                self._open_until = self._clock() + self.cooldown
+                self._consecutive_failures = 0
+                self.trips += 1
+
+
+class HedgePolicy:
+    """Per-call deadline plus hedged duplicate requests for slow calls.
+
+    Once `min_samples` primary latencies have been seen, an attempt still
+    running after the `percentile` of recent primary latencies (at least
+    `min_delay` seconds) gets a duplicate request; the first valid response
+    wins and the other is ignored. Hedges are capped at `max_extra_fraction`
+    of primary requests, so extra spend is bounded. `percentile=None`
+    disables hedging. With `deadline`, an attempt with no response after
+    that many seconds fails as a timeout (and is retried like one).
+    """
+
+    def __init__(self, percentile=95, deadline=None, max_extra_fraction=0.1, min_samples=20, window=200,
+                 min_delay=0.0):
+        self.percentile = percentile
+        self.deadline = deadline
+        self.max_extra_fraction = max_extra_fraction
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.primaries = 0
+        self.issued = 0
+        self.won = 0
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, latency):
+        """Records how long a primary request took."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def hedge_delay(self):
+        """Seconds after which to hedge the next attempt, or None (not enough data or disabled)."""
+        with self._lock:
+            self.primaries += 1
+            if self.percentile is None or len(self._latencies) < self.min_samples:
+                return None
+            latencies = list(self._latencies)
+        return max(self.min_delay, float(np.percentile(latencies, self.percentile)))
+
+    def try_acquire(self):
+        """Takes one hedge from the spend budget; False when the cap is reached."""
+        with self._lock:
+            if self.issued + 1 > self.max_extra_fraction * self.primaries:
+                return False
+            self.issued += 1
+            return True
+
+    def record_win(self):
+        with self._lock:
+            self.won += 1
+
+
+def make_hedge_policy(percentile=None, deadline=None, max_extra_fraction=0.1):
+    """HedgePolicy for the given settings, or None when neither hedging nor a deadline is wanted."""
+    if percentile is None and not deadline:
+        return None
+    return HedgePolicy(percentile=percentile, deadline=deadline or None, max_extra_fraction=max_extra_fraction)
+
+
+def _is_valid_response(response):
+    try:
+        extract_json(response.text)
+    except Exception:
+        return False
+    return True
+
+
+class ResilientModel:
+    """Wraps a model so every `generate_content` call is rate limited, retried
+    with backoff on retryable errors and gated by a shared circuit breaker.
+    With a metrics.RunMetrics, each call's latency, wait, retries and token
+    usage are recorded. With a HedgePolicy, attempts get a deadline and slow
+    ones a hedged duplicate (see HedgePolicy); the deadline is also passed
+    to backends whose `generate_content` takes a `timeout`, and such
+    backends are called directly when there is a deadline but no hedging.
+    Otherwise attempts run on a thread pool sized for `max_workers`
+    concurrent callers (HEDGE_POOL_SIZE threads when not given).
+
+    Exposes the wrapped model's `model_name`, so cache keys are unchanged.
+    """
+
+    # Attempts run on this many threads when hedging and `max_workers` is not given;
+    # each caller uses at most two.
+    HEDGE_POOL_SIZE = 64
+
+    def __init__(self, model, rate_limiter=None, retry_policy=None, breaker=None, metrics=None,
+                 hedge_policy=None, max_workers=None, sleep=time.sleep, clock=time.monotonic):
+        self.model = model
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker
+        self.metrics = metrics
+        self.hedge_policy = hedge_policy
+        self.pool_size = 2 * max(1, max_workers) if max_workers else self.HEDGE_POOL_SIZE
+        self.retries = 0
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pool = None
+
+    @property
+    def model_name(self):
+        return getattr(self.model, "model_name", None) or type(self.model).__name__
+
+    def generate_content(self, prompt, generation_config=None):
+        kwargs = {}
+        if generation_config is not None and accepts_generation_config(self.model):
+            kwargs["generation_config"] = generation_config
+        if self.hedge_policy is not None and self.hedge_policy.deadline and accepts_argument(self.model, "timeout"):
+            kwargs["timeout"] = self.hedge_policy.deadline
+        # Without hedging, a backend that enforces the deadline itself needs no pool thread.
+        direct = self.hedge_policy is None or (self.hedge_policy.percentile is None and "timeout" in kwargs)
+        attempt = 0
+        started = self._clock()
+        while True:
+            if self.breaker is not None:
+                self.breaker.wait()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(estimate_tokens(prompt))
+            call_started = self._clock()
+            hedge = None
+            try:
+                if direct:
+                    response = self.model.generate_content(prompt, **kwargs)
+                else:
+                    response, hedge = self._hedged_attempt(prompt, kwargs, call_started)
+            except Exception as e:
+                reason = classify_error(e)
+                if self.breaker is not None:
+                    self.breaker.record_failure(reason)
+                attempt += 1
+                if reason not in RETRYABLE_REASONS or attempt >= self.retry_policy.max_attempts:
+                    self._record(prompt, None, started, call_started, attempt - 1, reason)
+                    raise
+                with self._lock:
+                    self.retries += 1
+                self._sleep(self.retry_policy.delay(attempt))
+                continue
+            if self.breaker is not None:
+                self.breaker.record_success()
+            record = self._record(prompt, response, started, call_started, attempt, '', hedge)
+            if hedge is not None:
+                self._track_primary(hedge, call_started, record)
+            return response
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="hedge")
+            return self._pool
+
+    def _hedge_call(self, prompt, kwargs):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(estimate_tokens(prompt))
+        return self.model.generate_content(prompt, **kwargs)
+
+    def _hedged_attempt(self, prompt, kwargs, call_started):
+        """One attempt under the hedge policy; returns (response, hedge info).
+
+        Hedge info is (primary future, hedge issued, hedge won). The first
+        response whose text parses as JSON wins; an unparseable one is only
+        returned when nothing else is still pending, so the caller's repair
+        logic can deal with it. Raises TimeoutError past the deadline.
+        """
+        policy = self.hedge_policy
+        pool = self._executor()
+        primary = pool.submit(self.model.generate_content, prompt, **kwargs)
+        pending = {primary}
+        delay = policy.hedge_delay()
+        hedge_at = call_started + delay if delay is not None else None
+        deadline_at = call_started + policy.deadline if policy.deadline else None
+        issued = False
+        fallback = None
+        errors = []
+        while pending:
+            limits = [moment - self._clock() for moment in (hedge_at, deadline_at) if moment is not None]
+            done, pending = wait(pending, timeout=max(0.0, min(limits)) if limits else None,
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                if _is_valid_response(response):
+                    won = future is not primary
+                    if won:
+                        policy.record_win()
+                    return response, (primary, issued, won)
+                fallback = response
+            if not pending:
+                break
+            now = self._clock()
+            if deadline_at is not None and now >= deadline_at:
+                raise TimeoutError(f"No response within the {policy.deadline:g}s deadline.")
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                breaker_open = self.breaker is not None and self.breaker.is_open()
+                if primary in pending and not breaker_open and policy.try_acquire():
+                    pending.add(pool.submit(self._hedge_call, prompt, kwargs))
+                    issued = True
+        if fallback is not None:
+            return fallback, (primary, issued, False)
+        raise errors[0]
+
+    def _track_primary(self, hedge, call_started, record):
+        """Feeds the primary request's latency to the policy and, for hedged
+        calls, into the record's `unhedged_latency` once the primary finishes."""
+        primary, issued, _ = hedge
+
+        def finished(future):
+            latency = self._clock() - call_started
+            if future.exception() is None:
+                self.hedge_policy.observe(latency)
+            if issued and record is not None:
+                record.unhedged_latency = latency
+
+        primary.add_done_callback(finished)
+
+    def _record(self, prompt, response, started, call_started, retries, reason, hedge=None):
+        if self.metrics is None:
+            return None
+        now = self._clock()
+        if response is not None:
+            prompt_tokens, output_tokens, cached_tokens, estimated = usage_tokens(response, prompt)
+        else:
+            prompt_tokens, output_tokens, cached_tokens, estimated = estimate_tokens(prompt), 0, 0, True
+        hedged = hedge is not None and hedge[1]
+        if hedged:
+            # Both requests are billed; the losing one is not cancelled.
+            prompt_tokens, output_tokens, cached_tokens = prompt_tokens * 2, output_tokens * 2, cached_tokens * 2
+        record = CallRecord(
+            started=started - self.metrics.started,
+            latency=now - call_started,
+            wait=call_started - started,
+            retries=retries,
+            prompt_tokens=prompt_tokens,
+            output_tokens=output_tokens,
+            tokens_estimated=estimated,
+            reason=reason,
+            hedged=hedged,
+            hedge_won=hedged and hedge[2],
+            cached_tokens=cached_tokens,
+        )
+        self.metrics.record_call(record)
+        return record
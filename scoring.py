@@ -0,0 +1,191 @@
+# scoring.py
+# Deterministic, vectorized pre-processing of candidate scores: banding,
+# level-specific competency ordering and interpretation-text lookup.
+# Also provides the offline "template-only" summaries built from those texts
+# and the band signatures used to share one generated summary between
+# candidates with identical profiles.
+import re
+
+import numpy as np
+import pandas as pd
+
+from prompts import LEVEL_INTERPRETATIONS, OVERALL_INTERPRETATIONS
+
+OVERALL_COMPETENCIES = ['Overall Leadership', 'Reasoning & Problem Solving']
+LEVEL_COMPETENCIES = [
+    'Drives Results',
+    'Leads People',
+    'Manages Stakeholders',
+    'Thinks Strategically',
+    'Solves Challenges',
+    'Steers Change',
+]
+ALL_COMPETENCIES = OVERALL_COMPETENCIES + LEVEL_COMPETENCIES
+
+# (lower bounds, band labels) - a score at or above a bound gets that band.
+OVERALL_LEADERSHIP_BANDS = ([3.5, 3.0, 2.5], ['High', 'Moderate-High', 'Moderate-Low', 'Low'])
+STANDARD_BANDS = ([3.5, 2.5], ['High', 'Moderate', 'Low'])
+
+ORDER_COLUMN = 'Competency Order'
+
+# Bands a text may be quoted from as a Strength / Development Area bullet.
+STRENGTH_BANDS = ('High', 'Moderate-High', 'Moderate')
+DEVELOPMENT_BANDS = ('Moderate', 'Moderate-Low', 'Low')
+NO_BULLET = 'None identified from the assessment scores.'
+
+PRONOUNS = {
+    'SHE/HER': ('She', 'Her'),
+    'HE/HIM': ('He', 'His'),
+}
+
+# Stand-in name for summaries shared by a band-signature group; swapped for
+# each member's real name afterwards.
+PLACEHOLDER_NAME = 'Alex Morgan'
+
+
+def band_column(competency):
+    return f"{competency} Band"
+
+
+def band_scores(scores, bands):
+    """Vectorized banding of a numeric Series; missing scores stay missing."""
+    bounds, labels = bands
+    values = pd.to_numeric(scores, errors='coerce')
+    banded = np.select([values >= bound for bound in bounds], labels[:-1], default=labels[-1])
+    return pd.Series(banded, index=scores.index, dtype=object).where(values.notna())
+
+
+def add_bands(df):
+    """Returns a copy of `df` with a band column per competency and the
+    level-specific competencies sorted by descending score, in one pass."""
+    result = df.copy()
+    for competency in ALL_COMPETENCIES:
+        bands = OVERALL_LEADERSHIP_BANDS if competency == 'Overall Leadership' else STANDARD_BANDS
+        result[band_column(competency)] = band_scores(result[competency], bands)
+
+    scores = result[LEVEL_COMPETENCIES].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    # Stable sort on negated scores keeps the canonical order for ties; NaN sorts last.
+    order = np.argsort(np.nan_to_num(-scores, nan=np.inf), axis=1, kind='stable')
+    names = np.array(LEVEL_COMPETENCIES, dtype=object)[order]
+    result[ORDER_COLUMN] = [tuple(row) for row in names]
+    return result
+
+
+def resolve_interpretations(row):
+    """Looks up the interpretation texts for a row produced by `add_bands`.
+
+    Returns (opening_text, reasoning_text, level_texts) where level_texts is
+    a list of (band, text) pairs in descending score order.
+    """
+    level_rules = LEVEL_INTERPRETATIONS[str(row['Level']).strip().upper()]
+    opening = OVERALL_INTERPRETATIONS['Overall Leadership'][row[band_column('Overall Leadership')]]
+    reasoning = OVERALL_INTERPRETATIONS['Reasoning & Problem Solving'][row[band_column('Reasoning & Problem Solving')]]
+    level_texts = [
+        (row[band_column(competency)], level_rules[competency][row[band_column(competency)]])
+        for competency in row[ORDER_COLUMN]
+    ]
+    return opening, reasoning, level_texts
+
+
+# --- Band Signatures ---
+
+def pronoun_set(gender):
+    """Normalized pronoun key: one of PRONOUNS or 'THEY/THEM'."""
+    gender = str(gender).strip().upper()
+    return gender if gender in PRONOUNS else 'THEY/THEM'
+
+
+def band_signature(row):
+    """Everything a resolved-mode summary depends on apart from the name.
+
+    `row` must come from `add_bands`. Rows with equal signatures get
+    identical interpretation texts in the same order and the same pronouns.
+    """
+    bands = tuple(None if pd.isna(row[band_column(c)]) else row[band_column(c)] for c in ALL_COMPETENCIES)
+    return str(row['Level']).strip().upper(), bands, tuple(row[ORDER_COLUMN]), pronoun_set(row['Gender'])
+
+
+def substitute_name(text, name):
+    """Replaces PLACEHOLDER_NAME with `name` in one pass.
+
+    The placeholder's first name on its own becomes the member's first name
+    and its surname on its own the member's last name, so neither half of
+    the stand-in survives (e.g. "Morgan's team").
+    """
+    name = str(name).strip()
+    parts = name.split() or [name]
+    placeholder_first, placeholder_last = PLACEHOLDER_NAME.split()
+    replacements = {PLACEHOLDER_NAME: name, placeholder_first: parts[0], placeholder_last: parts[-1]}
+    pattern = rf"{re.escape(PLACEHOLDER_NAME)}|\b{re.escape(placeholder_first)}\b|\b{re.escape(placeholder_last)}\b"
+    return re.sub(pattern, lambda match: replacements[match.group(0)], text)
+
+
+# --- Template-Only Summaries (no API call) ---
+
+def _sentences(text):
+    return [sentence.strip() + '.' for sentence in text.rstrip('.').split('. ') if sentence.strip()]
+
+
+def _with_subject(sentence, subject, possessive):
+    """'Demonstrates X.' -> 'She demonstrates X.'; 'Focus tends...' -> 'Her focus tends...'."""
+    if sentence.startswith('Candidate '):
+        sentence = sentence[len('Candidate '):]
+    first_word = sentence.split(' ', 1)[0]
+    lowered = sentence[0].lower() + sentence[1:]
+    if first_word in ('Focus', 'Engagement', 'Fulfillment', 'Interest', 'Social'):
+        return f"{possessive} {lowered}"
+    return f"{subject} {lowered}"
+
+
+def _bullet(text):
+    sentences = _sentences(text)
+    return (sentences[1:2] or sentences[:1])[0]
+
+
+def _pick_bullets(level_texts, part_a, bands):
+    """Up to two bullets from the first `level_texts` whose band is in `bands`.
+
+    With no eligible competency the eligible PART A sentences are used
+    instead, and NO_BULLET when there are none of those either.
+    """
+    picked = [_bullet(text) for band, text in level_texts if band in bands][:2]
+    if picked:
+        return picked
+    sentences = [_sentences(text)[0].removeprefix('Candidate ') for band, text in part_a if band in bands]
+    return [sentence[0].upper() + sentence[1:] for sentence in sentences] or [NO_BULLET]
+
+
+def _compose(row, opening, reasoning, level_texts, body_count, subject, possessive):
+    name = str(row['Name']).strip()
+    paragraph = [_with_subject(opening, name, f"{name}'s")]
+    if body_count >= 6:
+        paragraph.append(_with_subject(reasoning, subject, possessive))
+    chosen = level_texts[:body_count - 1] + level_texts[-1:] if body_count < len(level_texts) else level_texts
+    for _, text in chosen:
+        paragraph.append(_with_subject(_sentences(text)[0], subject, possessive))
+
+    part_a = [(row[band_column(competency)], text)
+              for competency, text in zip(OVERALL_COMPETENCIES, (opening, reasoning))]
+    strengths = _pick_bullets(level_texts, part_a, STRENGTH_BANDS)
+    development = _pick_bullets(level_texts[::-1], part_a, DEVELOPMENT_BANDS)
+    return (
+        " ".join(paragraph)
+        + "\n\n**Strengths:**\n" + "\n".join(f"* {s}" for s in strengths)
+        + "\n\n**Development Areas:**\n" + "\n".join(f"* {s}" for s in development)
+    )
+
+
+def template_summaries(row):
+    """Builds the (200, 150, 100) summaries purely from interpretation texts.
+
+    `row` must come from `add_bands`. Sentences are taken verbatim from the
+    prompt's interpretation rules; They/Them candidates are referred to by
+    name to keep verb agreement correct.
+    """
+    opening, reasoning, level_texts = resolve_interpretations(row)
+    name = str(row['Name']).strip()
+    subject, possessive = PRONOUNS.get(str(row['Gender']).strip().upper(), (name, f"{name}'s"))
+    return tuple(
+        _compose(row, opening, reasoning, level_texts, body_count, subject, possessive)
+        for body_count in (6, 4, 2)
+    )
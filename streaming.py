@@ -0,0 +1,140 @@
+# streaming.py
+# Constant-memory reading and writing of candidate files: openpyxl read-only
+# and write-only workbooks for .xlsx, chunked pandas I/O for .csv and
+# record-batch reads for .parquet (input only; needs pyarrow).
+import io
+import os
+
+import openpyxl
+import pandas as pd
+
+
+def file_format(path):
+    """'csv', 'xlsx' or 'parquet', from the file extension."""
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.xlsx', '.xlsm'):
+        return 'xlsx'
+    if extension in ('.parquet', '.pq'):
+        return 'parquet'
+    raise ValueError(f"Unsupported file type '{extension}'. Use .xlsx, .csv or .parquet.")
+
+
+def _parquet_file(source):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Reading .parquet files requires pyarrow (pip install pyarrow).") from None
+    return pq.ParquetFile(source)
+
+
+def read_upload(file_name, content):
+    """Reads a whole uploaded candidate file (bytes) into a DataFrame, by its extension."""
+    kind = file_format(file_name)
+    if kind == 'csv':
+        return pd.read_csv(io.BytesIO(content))
+    if kind == 'parquet':
+        return _parquet_file(io.BytesIO(content)).read().to_pandas()
+    return pd.read_excel(io.BytesIO(content))
+
+
+def read_chunks(path, chunk_size=500, sheet_name=None):
+    """Yields DataFrames of at most `chunk_size` rows without loading the whole file."""
+    kind = file_format(path)
+    if kind == 'csv':
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            yield chunk.reset_index(drop=True)
+        return
+    if kind == 'parquet':
+        for batch in _parquet_file(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+        return
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        values = sheet.iter_rows(values_only=True)
+        header = next(values, None)
+        if header is None:
+            return
+        columns = [str(name) if name is not None else f"Unnamed: {index}" for index, name in enumerate(header)]
+        chunk = []
+        for row in values:
+            if all(value is None for value in row):
+                continue
+            chunk.append(row[:len(columns)])
+            if len(chunk) >= chunk_size:
+                yield pd.DataFrame(chunk, columns=columns)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=columns)
+    finally:
+        workbook.close()
+
+
+def _cell(value):
+    """openpyxl cannot store NaN/NaT; write them as empty cells."""
+    return None if pd.isna(value) else value
+
+
+class XlsxStreamWriter:
+    """Appends DataFrame chunks to a write-only workbook (path or binary buffer)."""
+
+    def __init__(self, target, columns, sheet_name='Generated_Summaries'):
+        self.target = target
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(sheet_name)
+        self.sheet.append(list(columns))
+
+    def write(self, df):
+        for values in df.itertuples(index=False, name=None):
+            self.sheet.append([_cell(value) for value in values])
+
+    def close(self):
+        self.workbook.save(self.target)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CsvStreamWriter:
+    """Appends DataFrame chunks to a CSV file."""
+
+    def __init__(self, target, columns):
+        self.handle = open(target, 'w', encoding='utf-8', newline='')
+        pd.DataFrame(columns=list(columns)).to_csv(self.handle, index=False)
+
+    def write(self, df):
+        df.to_csv(self.handle, header=False, index=False)
+        self.handle.flush()
+
+    def close(self):
+        self.handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_writer(path, columns):
+    """Streaming writer for `path`, chosen by its extension."""
+    kind = file_format(path)
+    if kind == 'csv':
+        return CsvStreamWriter(path, columns)
+    if kind == 'parquet':
+        raise ValueError("Parquet is supported for input only. Write results to .xlsx or .csv.")
+    return XlsxStreamWriter(path, columns)
+
+
+def dataframe_to_xlsx_bytes(df, sheet_name='Generated_Summaries'):
+    """Serializes a DataFrame through a write-only workbook and returns the bytes."""
+    output = io.BytesIO()
+    with XlsxStreamWriter(output, df.columns, sheet_name=sheet_name) as writer:
+        writer.write(df)
+    return output.getvalue()
@@ -0,0 +1,43 @@
+# conftest.py
+# Shared fixtures: the repo root on sys.path, a fake clock and a small cohort.
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COLUMNS = ['Name', 'Gender', 'Level', 'Overall Leadership', 'Reasoning & Problem Solving', 'Drives Results',
+           'Leads People', 'Manages Stakeholders', 'Thinks Strategically', 'Solves Challenges', 'Steers Change']
+
+
+class FakeClock:
+    """Manual clock whose `sleep` advances time instantly and records each wait."""
+
+    def __init__(self, start=1000.0):
+        self.now = start
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cohort():
+    rows = [
+        ['Candidate 1', 'They/Them', 'Shape', 4.9, 2.01, 4.48, 4.25, 3.77, 4.86, 3.79, 3.44],
+        ['Candidate 2', 'He/Him', 'Apply', 4.13, 1.13, 3.45, 4.53, 3.8, 1.99, 1.82, 2.42],
+        ['Candidate 3', 'She/Her', 'Guide', 2.2, 3.6, 3.9, 2.1, 1.5, 4.0, 3.0, 2.6],
+        ['Candidate 4', 'She/Her', 'Shape', 3.1, 3.1, 2.9, 3.3, 3.6, 2.4, 4.1, 1.9],
+    ]
+    return pd.DataFrame(rows, columns=COLUMNS)
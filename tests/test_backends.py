@@ -0,0 +1,115 @@
+# test_backends.py
+import json
+
+import pytest
+
+from backends import PrefixCache, SimulatedBackend, SimulatedRateLimit, SimulatedUnavailable, create_backend
+from core import build_batch_prompt, build_prompt, prepare_rows
+from resilience import RATE_LIMITED, UNAVAILABLE, classify_error
+from validator import structured_output_config, validate_summaries
+
+
+@pytest.fixture
+def rows(cohort):
+    return prepare_rows(cohort)
+
+
+def test_simulated_answers_pass_the_validator(rows):
+    backend = SimulatedBackend(time_scale=0, seed=0)
+
+    single = json.loads(backend.generate_content(build_prompt(rows[0])).text)
+    batch = json.loads(backend.generate_content(build_batch_prompt(rows[:2]),
+                                                generation_config=structured_output_config(batch=True)).text)
+
+    assert not any(validate_summaries(single).values())
+    assert [entry['id'] for entry in batch] == ['1', '2']
+    assert batch[1]['summary_100'].startswith('Candidate 2')
+    assert backend.calls == 2
+
+
+@pytest.mark.parametrize('option, error, reason', [
+    ('rate_limit_rate', SimulatedRateLimit, RATE_LIMITED),
+    ('error_rate', SimulatedUnavailable, UNAVAILABLE),
+])
+def test_simulated_failures_classify_like_the_real_ones(rows, option, error, reason):
+    backend = create_backend('simulated', time_scale=0, **{option: 1.0})
+
+    with pytest.raises(error) as raised:
+        backend.generate_content(build_prompt(rows[0]))
+    assert classify_error(raised.value) == reason
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match='simulated'):
+        create_backend('nope')
+
+
+class Registry:
+    """PrefixCache `create` callback that numbers its handles and can be made to fail."""
+
+    def __init__(self, fail=False):
+        self.created = []
+        self.fail = fail
+
+    def __call__(self, prefix):
+        if self.fail:
+            raise RuntimeError('cache creation failed')
+        self.created.append(prefix)
+        return len(self.created)
+
+
+def test_prefix_cache_registers_each_prefix_once_per_ttl(clock):
+    registry = Registry()
+    cache = PrefixCache(registry, 'model', ttl_seconds=100, refresh_margin=10, clock=clock)
+
+    assert cache.get('prefix') == 1
+    clock.now += 89
+    assert cache.get('prefix') == 1
+    assert cache.get('other') == 2
+    clock.now += 2
+    # Within the refresh margin of the TTL the entry is renewed.
+    assert cache.get('prefix') == 3
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_prefix_cache_keys_include_the_model(clock):
+    registry = Registry()
+    PrefixCache(registry, 'model-a', clock=clock).get('prefix')
+    cache = PrefixCache(registry, 'model-b', clock=clock)
+
+    assert cache.get('prefix') == 2
+
+
+def test_invalidated_prefix_is_registered_again(clock):
+    registry = Registry()
+    cache = PrefixCache(registry, 'model', clock=clock)
+    cache.get('a')
+    cache.get('b')
+
+    cache.invalidate('a')
+    assert cache.get('a') == 3
+    assert cache.get('b') == 2
+    cache.invalidate()
+    assert cache.get('b') == 4
+
+
+def test_failed_registration_is_not_retried_until_the_ttl_passes(clock):
+    registry = Registry(fail=True)
+    cache = PrefixCache(registry, 'model', ttl_seconds=100, refresh_margin=10, clock=clock)
+
+    assert cache.get('prefix') is None
+    assert cache.get('prefix') is None
+    assert (cache.failures, cache.fallbacks, cache.hits) == (1, 1, 0)
+    registry.fail = False
+    clock.now += 100
+    assert cache.get('prefix') == 1
+
+
+def test_simulated_context_cache_reports_cached_prefix_tokens(rows):
+    backend = SimulatedBackend(time_scale=0, seed=0, context_cache=True)
+    prompt = build_prompt(rows[0])
+
+    usage = backend.generate_content(prompt).usage_metadata
+
+    assert 0 < usage.cached_content_token_count < usage.prompt_token_count
+    assert backend.prefix_cache.misses == 1
@@ -0,0 +1,63 @@
+# test_cache.py
+import pytest
+
+import cache as cache_module
+from cache import SummaryCache, cache_key
+
+TRIPLE = ('two hundred', 'one fifty', 'one hundred')
+
+
+@pytest.fixture
+def wall_clock(clock, monkeypatch):
+    monkeypatch.setattr(cache_module.time, 'time', clock)
+    return clock
+
+
+def test_cache_key_depends_on_model_and_prompt():
+    assert cache_key('prompt', 'model-a') == cache_key('prompt', 'model-a')
+    assert cache_key('prompt', 'model-a') != cache_key('prompt', 'model-b')
+    assert cache_key('prompt', 'model-a') != cache_key('prompt!', 'model-a')
+
+
+def test_cache_round_trip_counts_hits_and_misses(tmp_path):
+    store = SummaryCache(str(tmp_path / 'cache.sqlite3'))
+
+    assert store.get('k') is None
+    store.put('k', TRIPLE)
+
+    assert store.get('k') == TRIPLE
+    assert (store.hits, store.misses) == (1, 1)
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path, wall_clock):
+    store = SummaryCache(str(tmp_path / 'cache.sqlite3'), max_entries=2)
+    store.put('a', TRIPLE)
+    wall_clock.now += 1
+    store.put('b', TRIPLE)
+    wall_clock.now += 1
+    store.get('a')
+    wall_clock.now += 1
+    store.put('c', TRIPLE)
+
+    assert len(store) == 2
+    assert store.get('b') is None
+    assert store.get('a') == TRIPLE
+    assert store.get('c') == TRIPLE
+
+
+def test_cache_expires_old_entries(tmp_path, wall_clock):
+    store = SummaryCache(str(tmp_path / 'cache.sqlite3'), max_age_seconds=60)
+    store.put('old', TRIPLE)
+    wall_clock.now += 61
+
+    assert store.get('old') is None
+    assert len(store) == 0
+
+
+def test_cache_bypass_misses_but_still_stores(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    SummaryCache(path, bypass=True).put('k', TRIPLE)
+    bypassed = SummaryCache(path, bypass=True)
+
+    assert bypassed.get('k') is None
+    assert SummaryCache(path).get('k') == TRIPLE
@@ -0,0 +1,45 @@
+# test_checkpoint.py
+from checkpoint import RunCheckpoint, upload_hash
+
+TRIPLE = ('two hundred', 'one fifty', 'one hundred')
+
+
+def test_upload_hash_identifies_the_bytes():
+    assert upload_hash(b'cohort') == upload_hash(b'cohort')
+    assert upload_hash(b'cohort') != upload_hash(b'cohort!')
+
+
+def test_completed_rows_survive_a_new_checkpoint_object(tmp_path):
+    RunCheckpoint('run', directory=str(tmp_path)).append(3, TRIPLE)
+
+    assert RunCheckpoint('run', directory=str(tmp_path)).load() == {3: TRIPLE}
+    assert RunCheckpoint('other', directory=str(tmp_path)).load() == {}
+
+
+def test_later_record_for_a_row_wins(tmp_path):
+    checkpoint = RunCheckpoint('run', directory=str(tmp_path))
+    checkpoint.append(0, ('old', 'old', 'old'))
+    checkpoint.append(0, TRIPLE)
+
+    assert checkpoint.load() == {0: TRIPLE}
+
+
+def test_torn_last_line_is_ignored_and_resume_continues(tmp_path):
+    checkpoint = RunCheckpoint('run', directory=str(tmp_path))
+    checkpoint.append(0, TRIPLE)
+    with open(checkpoint.path, 'a', encoding='utf-8') as handle:
+        handle.write('{"row": 1, "summar')
+
+    assert checkpoint.load() == {0: TRIPLE}
+
+    checkpoint.append(2, TRIPLE)
+    assert checkpoint.load() == {0: TRIPLE, 2: TRIPLE}
+
+
+def test_clear_removes_saved_rows(tmp_path):
+    checkpoint = RunCheckpoint('run', directory=str(tmp_path))
+    checkpoint.append(0, TRIPLE)
+    checkpoint.clear()
+    checkpoint.clear()
+
+    assert checkpoint.load() == {}
@@ -0,0 +1,39 @@
+# test_cli.py
+import pandas as pd
+
+import cli
+from checkpoint import RunCheckpoint, file_hash
+from core import SUMMARY_COLUMNS
+
+
+def test_template_run_writes_every_row(tmp_path, cohort, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cohort.to_csv('cohort.csv', index=False)
+
+    status = cli.main(['cohort.csv', 'out.csv', '--mode', 'template', '--chunk-size', '3', '--no-cache'])
+
+    written = pd.read_csv('out.csv')
+    assert status == 0
+    assert list(written['Name']) == list(cohort['Name'])
+    assert written[SUMMARY_COLUMNS].notna().all().all()
+
+
+def test_cli_keeps_the_app_checkpoint_of_the_same_file(tmp_path, cohort, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cohort.to_csv('cohort.csv', index=False)
+    app_checkpoint = RunCheckpoint(file_hash('cohort.csv'))
+    app_checkpoint.append(0, ('a', 'b', 'c'))
+
+    cli.main(['cohort.csv', 'out.csv', '--mode', 'template', '--no-cache'])
+
+    assert app_checkpoint.load() == {0: ('a', 'b', 'c')}
+
+
+def test_resume_skips_rows_completed_by_an_earlier_cli_run(tmp_path, cohort, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cohort.to_csv('cohort.csv', index=False)
+    RunCheckpoint(file_hash('cohort.csv'), directory=cli.CLI_CHECKPOINT_DIR).append(1, ('a', 'b', 'c'))
+
+    cli.main(['cohort.csv', 'out.csv', '--mode', 'template', '--no-cache', '--resume'])
+
+    assert pd.read_csv('out.csv').loc[1, SUMMARY_COLUMNS].tolist() == ['a', 'b', 'c']
@@ -0,0 +1,250 @@
+# test_core.py
+import json
+import re
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from cache import SummaryCache
+from core import (
+    MODE_SIGNATURE,
+    SummaryGenerationError,
+    generate_rows,
+    generate_summaries_for_batch,
+    generate_summaries_for_candidate,
+    group_by_signature,
+    prepare_rows,
+    signature_report,
+)
+from resilience import UNAVAILABLE
+
+TRIPLE = {'summary_200': 'long', 'summary_150': 'medium', 'summary_100': 'short'}
+
+
+class FakeModel:
+    """Returns `text` for every prompt and keeps the prompts it was sent."""
+
+    def __init__(self, text):
+        self.text = text
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        return SimpleNamespace(text=self.text)
+
+
+def _summary(name, words):
+    """A summary of about `words` words naming the candidate, with two bullets per section."""
+    bullet = '* Shows a consistent and practical approach.'
+    paragraph = ' '.join([name] + ['word'] * (words - 24 - len(name.split())))
+    return f"{paragraph}\n\n**Strengths:**\n{bullet}\n{bullet}\n\n**Development Areas:**\n{bullet}\n{bullet}"
+
+
+class PromptModel:
+    """Answers single and batch prompts with summaries naming each candidate;
+    `requests` logs whether each call was a batch or a single request."""
+
+    def __init__(self):
+        self.requests = []
+
+    def payload(self, prompt):
+        names = re.findall(r"\* \*\*Name:\*\* (.+)", prompt)
+        entries = [{'summary_200': _summary(name, 200), 'summary_150': _summary(name, 150),
+                    'summary_100': _summary(name, 100)} for name in names]
+        ids = re.findall(r"\*\*Candidate ID:\*\* (\d+)", prompt)
+        if not ids:
+            return entries[0]
+        return [dict(id=candidate_id, **entry) for candidate_id, entry in zip(ids, entries)]
+
+    def generate_content(self, prompt):
+        self.requests.append('batch' if '**Candidate ID:**' in prompt else 'single')
+        return SimpleNamespace(text=json.dumps(self.payload(prompt)))
+
+
+class DroppingModel(PromptModel):
+    """Leaves candidate ID 2 out of every batch response."""
+
+    def payload(self, prompt):
+        payload = super().payload(prompt)
+        return [entry for entry in payload if entry['id'] != '2'] if isinstance(payload, list) else payload
+
+
+class MalformedBatchModel(PromptModel):
+    """Answers batch requests with prose; optionally fails one candidate's single request."""
+
+    def __init__(self, failing_name=None):
+        super().__init__()
+        self.failing_name = failing_name
+
+    def generate_content(self, prompt):
+        response = super().generate_content(prompt)
+        if '**Candidate ID:**' in prompt:
+            response.text = 'Sorry, I cannot produce JSON today.'
+        elif self.failing_name and f"**Name:** {self.failing_name}" in prompt:
+            raise ConnectionError('503 The model is overloaded')
+        return response
+
+
+class ShortModel(PromptModel):
+    """Returns summaries far below the target length, even when asked to repair them."""
+
+    def payload(self, prompt):
+        return {key: _summary('Short', 40) for key in super().payload(prompt)}
+
+
+class RepairModel(PromptModel):
+    """First answer has a 60-word summary_200; the follow-up request fixes it."""
+
+    def payload(self, prompt):
+        payload = super().payload(prompt)
+        if not self.requests[1:]:
+            payload['summary_200'] = _summary('Too short', 60)
+        return payload
+
+
+class FailingRepairModel(RepairModel):
+    """Like RepairModel, but the follow-up request fails with a connection error."""
+
+    def generate_content(self, prompt):
+        if self.requests:
+            self.requests.append('single')
+            raise ConnectionError('503 The model is overloaded')
+        return super().generate_content(prompt)
+
+
+@pytest.fixture
+def rows(cohort):
+    return [row for _, row in cohort.iterrows()]
+
+
+def _names(outcomes):
+    return [outcome[0].split()[:2] for outcome in outcomes]
+
+
+def test_candidate_summaries_are_parsed_from_the_response(cohort):
+    model = FakeModel('```json\n' + json.dumps(TRIPLE) + '\n```')
+
+    assert generate_summaries_for_candidate(cohort.iloc[0], model) == ('long', 'medium', 'short')
+    assert '* **Name:** Candidate 1' in model.prompts[0]
+
+
+def test_unparseable_response_raises(cohort):
+    with pytest.raises(SummaryGenerationError):
+        generate_summaries_for_candidate(cohort.iloc[0], FakeModel('not json'))
+
+
+def test_cache_hit_skips_the_model(cohort, tmp_path):
+    store = SummaryCache(str(tmp_path / 'cache.sqlite3'))
+    model = PromptModel()
+
+    first = generate_summaries_for_candidate(cohort.iloc[0], model, cache=store)
+    second = generate_summaries_for_candidate(cohort.iloc[0], model, cache=store)
+
+    assert first == second
+    assert model.requests == ['single']
+    assert (store.hits, store.misses) == (1, 1)
+
+
+def test_batch_retries_only_the_missing_candidate(rows):
+    model = DroppingModel()
+
+    outcomes = generate_summaries_for_batch(rows[:3], model)
+
+    assert model.requests == ['batch', 'single']
+    assert _names(outcomes) == [['Candidate', '1'], ['Candidate', '2'], ['Candidate', '3']]
+
+
+def test_unparseable_batch_is_split_down_to_single_requests(rows):
+    model = MalformedBatchModel()
+
+    outcomes = generate_summaries_for_batch(rows, model)
+
+    assert model.requests.count('batch') == 3
+    assert model.requests.count('single') == 4
+    assert _names(outcomes) == [['Candidate', str(number)] for number in range(1, 5)]
+
+
+def test_one_failing_candidate_does_not_sink_the_batch(rows):
+    outcomes = generate_summaries_for_batch(rows, MalformedBatchModel(failing_name='Candidate 3'))
+
+    assert isinstance(outcomes[2], SummaryGenerationError)
+    assert outcomes[2].reason == UNAVAILABLE
+    assert all(isinstance(outcome, tuple) for index, outcome in enumerate(outcomes) if index != 2)
+
+
+def test_batch_serves_cached_rows_locally(rows, tmp_path):
+    store = SummaryCache(str(tmp_path / 'cache.sqlite3'))
+    generate_summaries_for_candidate(rows[0], PromptModel(), cache=store)
+    model = PromptModel()
+
+    outcomes = generate_summaries_for_batch(rows[:2], model, cache=store)
+
+    assert model.requests == ['single']
+    assert store.hits == 1
+    assert _names(outcomes) == [['Candidate', '1'], ['Candidate', '2']]
+
+
+def test_only_the_failing_variant_is_requested_again(rows):
+    model = RepairModel()
+    prompts = []
+    model.generate_content = lambda prompt, inner=model.generate_content: prompts.append(prompt) or inner(prompt)
+
+    outcome = generate_summaries_for_candidate(rows[0], model)
+
+    assert model.requests == ['single', 'single']
+    assert 'only these keys: "summary_200".' in prompts[1]
+    assert outcome[0].startswith('Candidate 1')
+
+
+def test_failed_repair_request_keeps_the_original_variants(rows):
+    model = FailingRepairModel()
+
+    outcome = generate_summaries_for_candidate(rows[0], model)
+
+    assert model.requests == ['single', 'single']
+    assert outcome[0] == _summary('Too short', 60)
+    assert outcome[1].startswith('Candidate 1')
+
+
+def test_missing_variant_fails_the_row(rows):
+    model = FakeModel(json.dumps({'summary_200': _summary('Candidate 1', 200)}))
+
+    with pytest.raises(SummaryGenerationError, match='missing summary_150, summary_100'):
+        generate_summaries_for_candidate(rows[0], model)
+
+
+def test_imperfect_summaries_are_cached(rows, tmp_path):
+    store = SummaryCache(str(tmp_path / 'cache.sqlite3'))
+    first = generate_summaries_for_candidate(rows[0], ShortModel(), cache=store)
+    model = ShortModel()
+
+    assert generate_summaries_for_candidate(rows[0], model, cache=store) == first
+    assert generate_summaries_for_batch(rows[:1], model, cache=store) == [first]
+    assert model.requests == []
+
+
+def test_retry_imperfect_regenerates_on_the_next_run(rows, tmp_path):
+    store = SummaryCache(str(tmp_path / 'cache.sqlite3'))
+    generate_summaries_for_candidate(rows[0], ShortModel(), cache=store, retry_imperfect=True)
+    model = ShortModel()
+
+    generate_summaries_for_candidate(rows[0], model, cache=store, retry_imperfect=True)
+
+    assert model.requests
+    assert len(store) == 0
+
+
+def test_signature_mode_sends_one_request_per_profile(cohort):
+    twin = cohort.iloc[[0]].assign(Name='Sara Khan', **{'Drives Results': 4.4})
+    rows = prepare_rows(pd.concat([cohort, twin], ignore_index=True), MODE_SIGNATURE)
+    groups = group_by_signature(rows)
+    model = PromptModel()
+
+    results = generate_rows(rows, model=model, mode=MODE_SIGNATURE)
+
+    assert groups == [[0, 4], [1], [2], [3]]
+    assert signature_report(groups)['calls_saved'] == 1
+    assert len(model.requests) == 4
+    assert [result.summaries[0].split()[:2] for result in results] == [
+        ['Candidate', '1'], ['Candidate', '2'], ['Candidate', '3'], ['Candidate', '4'], ['Sara', 'Khan']]
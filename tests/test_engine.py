@@ -0,0 +1,110 @@
+# test_engine.py
+import time
+
+from engine import ERROR_SUMMARIES, RateLimiter, make_batches, run_batch, run_batches
+from resilience import RATE_LIMITED
+
+
+class RateLimitError(Exception):
+    code = 429
+
+
+def test_run_batch_returns_results_in_input_order():
+    rows = list(range(6))
+
+    def worker(row):
+        # Later rows finish first, so completion order is the reverse of input order.
+        time.sleep(0.01 * (len(rows) - row))
+        return (f"a{row}", f"b{row}", f"c{row}")
+
+    results = run_batch(rows, worker, max_workers=6)
+
+    assert [result.position for result in results] == rows
+    assert [result.summaries[0] for result in results] == [f"a{row}" for row in rows]
+
+
+def test_run_batch_calls_on_result_once_per_row():
+    calls = []
+
+    def worker(row):
+        if row == 2:
+            raise RateLimitError('429 quota')
+        return ('x', 'y', 'z')
+
+    results = run_batch(range(5), worker, max_workers=3, on_result=lambda *args: calls.append(args))
+
+    assert [completed for completed, _, _ in calls] == [1, 2, 3, 4, 5]
+    assert {total for _, total, _ in calls} == {5}
+    assert sorted(result.position for _, _, result in calls) == list(range(5))
+    assert results[2].summaries == ERROR_SUMMARIES
+    assert results[2].reason == RATE_LIMITED
+    assert results[2].failure == f"{RATE_LIMITED}: 429 quota"
+    assert not results[0].error
+
+
+def test_run_batches_groups_rows_and_keeps_order():
+    rows = ['a1', 'b1', 'a2', 'a3', 'b2']
+    seen = []
+
+    def batch_worker(batch):
+        seen.append(list(batch))
+        return [(row, row, row) for row in batch]
+
+    results = run_batches(rows, batch_worker, batch_size=2, max_workers=1, group_key=lambda row: row[0])
+
+    assert sorted(seen) == [['a1', 'a2'], ['a3'], ['b1', 'b2']]
+    assert [result.summaries[0] for result in results] == rows
+
+
+def test_run_batches_fails_every_row_of_a_crashed_batch():
+    def batch_worker(batch):
+        raise RuntimeError('boom')
+
+    results = run_batches(list('abc'), batch_worker, batch_size=2)
+
+    assert [result.error for result in results] == ['boom'] * 3
+
+
+def test_make_batches_respects_size_and_groups():
+    assert make_batches(list('abcde'), 2) == [[0, 1], [2, 3], [4]]
+    assert make_batches(['x', 'y', 'x', 'x'], 2, group_key=str) == [[0, 2], [3], [1]]
+
+
+def test_rate_limiter_waits_for_request_budget(clock):
+    limiter = RateLimiter(requests_per_minute=2, clock=clock, sleep=clock.sleep)
+
+    limiter.acquire()
+    clock.now += 10
+    limiter.acquire()
+    limiter.acquire()
+
+    # The third request waits until the first one leaves the one-minute window.
+    assert clock.sleeps == [50.0]
+
+
+def test_rate_limiter_waits_for_token_budget(clock):
+    limiter = RateLimiter(tokens_per_minute=100, clock=clock, sleep=clock.sleep)
+
+    limiter.acquire(60)
+    clock.now += 15
+    limiter.acquire(30)
+    limiter.acquire(30)
+
+    assert clock.sleeps == [45.0]
+
+
+def test_rate_limiter_lets_an_oversized_request_through_on_an_empty_window(clock):
+    limiter = RateLimiter(tokens_per_minute=100, clock=clock, sleep=clock.sleep)
+
+    limiter.acquire(500)
+
+    assert clock.sleeps == []
+
+
+def test_rate_limiter_without_limits_never_waits(clock):
+    limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+
+    for _ in range(1000):
+        limiter.acquire(10_000)
+
+    assert clock.sleeps == []
@@ -0,0 +1,88 @@
+# test_jobs.py
+import io
+import itertools
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import jobs
+from backends import SimulatedBackend
+from checkpoint import RunCheckpoint
+from core import SUMMARY_COLUMNS
+from engine import RateLimiter
+from jobs import STATUS_DONE, STATUS_QUEUED, STATUS_RUNNING, JobRunner, JobStore, results_frame
+from resilience import CircuitBreaker
+
+
+class CountingLimiter(RateLimiter):
+    def __init__(self):
+        super().__init__()
+        self.acquired = 0
+
+    def acquire(self, tokens=0):
+        self.acquired += 1
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # Distinct, increasing creation times so queue order is deterministic.
+    ticks = itertools.count(1)
+    monkeypatch.setattr(jobs, 'time', SimpleNamespace(time=lambda: float(next(ticks)), monotonic=time.monotonic))
+    monkeypatch.chdir(tmp_path)
+    return JobStore(str(tmp_path / 'jobs'))
+
+
+def _xlsx(df):
+    output = io.BytesIO()
+    df.to_excel(output, index=False)
+    return output.getvalue()
+
+
+def test_claim_next_alternates_between_owners(store):
+    first_a = store.submit('a', 'a1.xlsx', b'', 1)
+    second_a = store.submit('a', 'a2.xlsx', b'', 1)
+    only_b = store.submit('b', 'b1.xlsx', b'', 1)
+
+    assert store.queue_position(only_b) == 2
+    assert [store.claim_next()['id'] for _ in range(3)] == [first_a, only_b, second_a]
+    assert store.claim_next() is None
+    assert store.get(second_a)['status'] == STATUS_RUNNING
+
+
+def test_requeue_running_returns_jobs_to_the_queue(store):
+    job_id = store.submit('a', 'a1.xlsx', b'', 1, settings={'mode': 'template'})
+    store.claim_next()
+
+    assert store.requeue_running() == 1
+    job = store.get(job_id)
+    assert job['status'] == STATUS_QUEUED
+    assert job['settings']['mode'] == 'template'
+    assert job['settings']['max_attempts'] == jobs.DEFAULT_SETTINGS['max_attempts']
+
+
+def test_requeued_job_resumes_from_its_checkpoint(store, cohort):
+    job_id = store.submit('a', 'cohort.xlsx', _xlsx(cohort), len(cohort), settings={'mode': 'template'})
+    RunCheckpoint(job_id, directory=store.job_dir(job_id)).append(0, ('kept', 'kept', 'kept'))
+
+    JobRunner(store).run_job(store.claim_next())
+
+    job = store.get(job_id)
+    results = results_frame(store.results(job_id))
+    assert (job['status'], job['completed'], job['failed']) == (STATUS_DONE, len(cohort), 0)
+    assert results.loc[0, SUMMARY_COLUMNS[0]] == 'kept'
+    assert results[SUMMARY_COLUMNS].notna().all().all()
+
+
+def test_jobs_share_one_rate_limiter_and_breaker(store, cohort):
+    limiter, breaker = CountingLimiter(), CircuitBreaker()
+    model = SimulatedBackend(time_scale=0, seed=0)
+    runner = JobRunner(store, model=model, rate_limiter=limiter, breaker=breaker)
+    for owner in ('a', 'b'):
+        store.submit(owner, 'cohort.xlsx', _xlsx(cohort), len(cohort), settings={'bypass_cache': True})
+
+    for _ in range(2):
+        runner.run_job(store.claim_next())
+
+    assert model.calls == 2 * len(cohort)
+    assert limiter.acquired == model.calls
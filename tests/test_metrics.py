@@ -0,0 +1,81 @@
+# test_metrics.py
+import json
+from types import SimpleNamespace
+
+from engine import run_batch
+from metrics import CallRecord, RunMetrics, usage_tokens
+from resilience import ResilientModel, RetryPolicy
+
+VALID = SimpleNamespace(text='{}', usage_metadata=SimpleNamespace(
+    prompt_token_count=1000, candidates_token_count=300, thoughts_token_count=100, cached_content_token_count=600))
+
+
+def _call(latency, wait=0.0, retries=0, reason=''):
+    return CallRecord(started=0.0, latency=latency, wait=wait, retries=retries, prompt_tokens=1000,
+                      output_tokens=400, tokens_estimated=False, reason=reason)
+
+
+def test_usage_tokens_prefers_reported_usage():
+    assert usage_tokens(VALID, 'prompt') == (1000, 400, 600, False)
+    assert usage_tokens(SimpleNamespace(text='x' * 40), 'p' * 400) == (100, 10, 0, True)
+
+
+def test_summary_aggregates_calls_and_rows(clock):
+    metrics = RunMetrics('models/gemini-2.5-pro', clock=clock)
+    for latency in (1.0, 2.0, 3.0, 4.0):
+        metrics.record_call(_call(latency, wait=0.5))
+    metrics.record_call(_call(5.0, retries=2, reason='rate_limited'))
+    metrics.record_rows(3, 0.25)
+    metrics.record_rows(1, 0.75, failed=1)
+    clock.now += 120
+    metrics.finish()
+    clock.now += 1000
+
+    summary = metrics.summary()
+
+    assert summary['model'] == 'gemini-2.5-pro'
+    assert (summary['rows'], summary['failed_rows']) == (4, 1)
+    assert summary['elapsed_seconds'] == 120
+    assert summary['rows_per_minute'] == 2.0
+    assert (summary['calls'], summary['failed_calls'], summary['retries']) == (5, 1, 2)
+    assert summary['latency_p50'] == 3.0
+    assert summary['prompt_tokens'] == 5000 and summary['output_tokens'] == 2000
+    assert summary['tokens_per_candidate'] == 1750.0
+    # 5000 input tokens at $1.25/M plus 2000 output tokens at $10/M.
+    assert summary['estimated_cost_usd'] == 0.0262
+    assert summary['cost_per_candidate_usd'] == 0.00655
+
+
+def test_cached_prompt_tokens_are_priced_at_the_cached_rate(clock):
+    metrics = RunMetrics('gemini-2.5-pro', clock=clock)
+    call = _call(1.0)
+    call.cached_tokens = 800
+    metrics.record_call(call)
+
+    summary = metrics.summary()
+
+    assert (summary['cached_prompt_tokens'], summary['cached_prompt_pct']) == (800, 80.0)
+    # 200 input tokens at $1.25/M, 800 cached at $0.31/M and 400 output at $10/M.
+    assert summary['estimated_cost_usd'] == 0.0045
+
+
+def test_unknown_model_and_empty_run_have_no_estimates(clock):
+    summary = RunMetrics('my-model', clock=clock).summary()
+
+    assert summary['estimated_cost_usd'] is None
+    assert summary['latency_p50'] is None
+    assert summary['rows_per_minute'] is None
+
+
+def test_resilient_model_and_engine_feed_the_collector():
+    metrics = RunMetrics()
+    model = SimpleNamespace(generate_content=lambda prompt: VALID)
+    client = ResilientModel(model, retry_policy=RetryPolicy(), metrics=metrics)
+
+    run_batch(range(3), lambda row: (client.generate_content('prompt'),) * 3, metrics=metrics)
+
+    assert [call.prompt_tokens for call in metrics.calls] == [1000] * 3
+    assert metrics.rows == 3
+    exported = json.loads(metrics.to_json())
+    assert exported['summary']['calls'] == 3
+    assert metrics.calls_csv().splitlines()[0].startswith('started,latency,wait,retries')
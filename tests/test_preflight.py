@@ -0,0 +1,60 @@
+# test_preflight.py
+import numpy as np
+
+from preflight import ERRORS_COLUMN, validate_cohort
+
+
+def test_valid_cohort_passes_and_scores_become_floats(cohort):
+    cohort['Drives Results'] = cohort['Drives Results'].astype(str)
+    report = validate_cohort(cohort)
+
+    assert report.ok
+    assert report.valid_positions == [0, 1, 2, 3]
+    assert report.failures() == {}
+    assert report.cleaned['Drives Results'].dtype == float
+
+
+def test_missing_column_invalidates_every_row(cohort):
+    report = validate_cohort(cohort.drop(columns=['Steers Change']))
+
+    assert report.missing_columns == ['Steers Change']
+    assert report.invalid_count == 4
+    assert not report.ok
+    assert all('missing columns: Steers Change' in message for message in report.row_errors)
+
+
+def test_duplicate_after_blank_name_reports_integer_sheet_row(cohort):
+    cohort.loc[0, 'Name'] = np.nan
+    cohort.loc[3, 'Name'] = ' candidate 2 '
+    report = validate_cohort(cohort)
+
+    assert report.row_errors[0] == 'Name is empty'
+    assert report.row_errors[3] == 'duplicate Name (first seen on sheet row 3)'
+    assert report.valid_positions == [1, 2]
+
+
+def test_level_gender_and_score_problems_are_reported_per_row(cohort):
+    cohort['Leads People'] = cohort['Leads People'].astype(object)
+    cohort.loc[0, 'Level'] = 'Lead'
+    cohort.loc[1, 'Gender'] = 'X'
+    cohort.loc[2, 'Leads People'] = 'n/a'
+    cohort.loc[3, 'Leads People'] = ' '
+    cohort.loc[3, 'Steers Change'] = 5.5
+    report = validate_cohort(cohort)
+
+    assert report.row_errors[0].startswith('Level must be one of')
+    assert report.row_errors[1].startswith('Gender must be one of')
+    assert report.row_errors[2] == 'Leads People is not a number'
+    assert report.row_errors[3] == 'Leads People is missing; Steers Change is outside 1.00-5.00'
+    assert report.failures()[2] == 'invalid_input: Leads People is not a number'
+
+
+def test_error_report_lists_sheet_rows_and_valid_rows_are_reindexed(cohort):
+    cohort.loc[1, 'Level'] = ''
+    report = validate_cohort(cohort)
+
+    errors = report.error_report()
+    assert list(errors['Sheet Row']) == [3]
+    assert errors.loc[0, ERRORS_COLUMN].startswith('Level must be one of')
+    assert list(report.valid_rows()['Name']) == ['Candidate 1', 'Candidate 3', 'Candidate 4']
+    assert list(report.valid_rows().index) == [0, 1, 2]
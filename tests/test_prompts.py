@@ -0,0 +1,90 @@
+# test_prompts.py
+import pytest
+
+from prompts import (
+    COMPILED_PROMPTS,
+    DEFINITIVE_PROMPT,
+    FALLBACK_PROMPT,
+    LEVELS,
+    PROMPT_SECTIONS,
+    RESOLVED_PROMPT,
+    RenderedPrompt,
+    prompt_for_level,
+    render_batch_task,
+    render_candidate,
+    render_task,
+    split_prompt,
+    token_savings_report,
+)
+
+
+def test_split_prompt_covers_the_whole_prompt():
+    sections = split_prompt(DEFINITIVE_PROMPT)
+    rebuilt = sections.head + ''.join(sections.levels.values()) + sections.tail + sections.task + sections.end
+
+    assert rebuilt == DEFINITIVE_PROMPT
+    assert tuple(sections.levels) == LEVELS
+    assert sections.task.startswith('<task>') and sections.task.endswith('</task>')
+
+
+def test_split_prompt_requires_level_blocks():
+    with pytest.raises(ValueError):
+        split_prompt("**PART B:** nothing here\n**PART C:** steps\n<task></task>")
+
+
+def test_fallback_template_reproduces_the_full_prompt():
+    assert FALLBACK_PROMPT.render(PROMPT_SECTIONS.task) == DEFINITIVE_PROMPT
+
+
+@pytest.mark.parametrize('level', LEVELS)
+def test_level_template_keeps_only_its_own_block(level):
+    prompt = COMPILED_PROMPTS[level].render(PROMPT_SECTIONS.task)
+
+    assert f"***LEVEL: {level}***" in prompt.upper()
+    for other in set(LEVELS) - {level}:
+        assert f"***LEVEL: {other}***" not in prompt.upper()
+    assert '**PART A:' in prompt and '**PART C:' in prompt
+
+
+def test_rendered_prompt_is_a_string_with_its_static_prefix():
+    prompt = COMPILED_PROMPTS['APPLY'].render('<task>x</task>')
+
+    assert isinstance(prompt, RenderedPrompt) and isinstance(prompt, str)
+    assert prompt.prefix == COMPILED_PROMPTS['APPLY'].prefix
+    assert prompt.prefix + prompt.remainder == prompt
+    assert prompt.remainder.startswith('<task>x</task>')
+
+
+def test_resolved_template_has_no_band_tables_or_sorting_step():
+    prefix = RESOLVED_PROMPT.prefix
+
+    assert prefix.count('**PART C:') == 1
+    assert 'Moderate-High (3.0-3.49)' not in prefix
+    assert 'internally sorting' not in prefix
+    assert '"Level-Specific Interpretations"' in prefix
+    assert '3.  **Bullet Points:**' in prefix and '<exemplars>' in prefix
+
+
+def test_prompt_for_level_normalizes_and_falls_back():
+    assert prompt_for_level(' shape ') is COMPILED_PROMPTS['SHAPE']
+    assert prompt_for_level('Unknown') is FALLBACK_PROMPT
+    assert prompt_for_level(None) is FALLBACK_PROMPT
+
+
+def test_rendered_task_carries_the_candidate(cohort):
+    task = render_task(render_candidate(cohort.iloc[1]))
+
+    assert '* **Name:** Candidate 2' in task
+    assert '* **Level:** Apply' in task
+    assert '    * Leads People: 4.53' in task
+
+
+def test_batch_task_numbers_candidates_from_one(cohort):
+    task = render_batch_task([render_candidate(row) for _, row in cohort.iloc[:2].iterrows()])
+
+    assert task.index('**Candidate ID:** 1') < task.index('Candidate 1') < task.index('**Candidate ID:** 2')
+    assert '**Candidate ID:** 3' not in task
+
+
+def test_compiled_templates_are_smaller():
+    assert all(entry['Saved (%)'] > 0 for entry in token_savings_report())
@@ -0,0 +1,174 @@
+# test_resilience.py
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from engine import RateLimiter
+from metrics import RunMetrics
+from resilience import (
+    RATE_LIMITED,
+    TIMEOUT,
+    UNAVAILABLE,
+    CircuitBreaker,
+    HedgePolicy,
+    ResilientModel,
+    RetryPolicy,
+    classify_error,
+    make_hedge_policy,
+)
+
+VALID = SimpleNamespace(text=json.dumps({'summary_100': 'ok'}))
+
+
+class ApiError(Exception):
+    def __init__(self, code):
+        super().__init__(f"{code} error")
+        self.code = code
+
+
+class ScriptedModel:
+    """Fake model that plays back `script`: each item is an exception to raise,
+    a number of seconds to sleep before answering, or None to answer at once."""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            step = self.script[self.calls] if self.calls < len(self.script) else None
+            self.calls += 1
+        if isinstance(step, Exception):
+            raise step
+        if step:
+            time.sleep(step)
+        return VALID
+
+
+def test_classify_error_by_code_and_type():
+    assert classify_error(ApiError(429)) == RATE_LIMITED
+    assert classify_error(ApiError(503)) == UNAVAILABLE
+    assert classify_error(TimeoutError()) == TIMEOUT
+
+
+def test_retries_retryable_errors_with_backoff(clock):
+    model = ScriptedModel(ApiError(429), ApiError(503))
+    policy = RetryPolicy(max_attempts=3, base_delay=1.0)
+    client = ResilientModel(model, retry_policy=policy, sleep=clock.sleep, clock=clock)
+
+    assert client.generate_content('prompt') is VALID
+    assert model.calls == 3
+    assert client.retries == 2
+    assert len(clock.sleeps) == 2
+    assert all(0 <= delay <= 4.0 for delay in clock.sleeps)
+
+
+def test_client_errors_are_not_retried(clock):
+    model = ScriptedModel(ApiError(400))
+    client = ResilientModel(model, retry_policy=RetryPolicy(max_attempts=4), sleep=clock.sleep, clock=clock)
+
+    with pytest.raises(ApiError):
+        client.generate_content('prompt')
+    assert model.calls == 1
+    assert clock.sleeps == []
+
+
+def test_every_attempt_goes_through_the_rate_limiter(clock):
+    limiter = RateLimiter(requests_per_minute=1, clock=clock, sleep=clock.sleep)
+    client = ResilientModel(ScriptedModel(ApiError(503)), rate_limiter=limiter, sleep=lambda seconds: None)
+
+    client.generate_content('prompt')
+
+    assert clock.sleeps == [60.0]
+
+
+def test_circuit_breaker_opens_after_consecutive_overload_errors(clock):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=30, clock=clock, sleep=clock.sleep)
+
+    breaker.record_failure(RATE_LIMITED)
+    breaker.record_success()
+    breaker.record_failure(RATE_LIMITED)
+    assert not breaker.is_open()
+
+    breaker.record_failure(UNAVAILABLE)
+    assert breaker.is_open()
+    assert breaker.trips == 1
+
+    breaker.wait()
+    assert clock.sleeps == [30]
+    assert not breaker.is_open()
+
+
+def test_hedge_policy_waits_for_samples_and_caps_spend():
+    policy = HedgePolicy(percentile=50, max_extra_fraction=0.25, min_samples=3)
+    assert policy.hedge_delay() is None
+
+    for latency in (1.0, 2.0, 3.0):
+        policy.observe(latency)
+    assert policy.hedge_delay() == 2.0
+
+    policy.primaries = 8
+    assert [policy.try_acquire() for _ in range(3)] == [True, True, False]
+
+
+def test_make_hedge_policy_is_off_without_settings():
+    assert make_hedge_policy() is None
+    assert make_hedge_policy(deadline=10).percentile is None
+
+
+def test_slow_call_is_hedged_and_the_fast_duplicate_wins():
+    policy = HedgePolicy(percentile=50, max_extra_fraction=1.0, min_samples=3)
+    for _ in range(3):
+        policy.observe(0.01)
+    metrics = RunMetrics()
+    client = ResilientModel(ScriptedModel(2.0), hedge_policy=policy, metrics=metrics)
+
+    started = time.monotonic()
+    assert client.generate_content('prompt') is VALID
+
+    assert time.monotonic() - started < 1.0
+    assert (policy.issued, policy.won) == (1, 1)
+    assert metrics.calls[0].hedged and metrics.calls[0].hedge_won
+
+
+def test_deadline_turns_a_hung_call_into_a_timeout():
+    client = ResilientModel(ScriptedModel(2.0), retry_policy=RetryPolicy(max_attempts=1),
+                            hedge_policy=HedgePolicy(percentile=None, deadline=0.05))
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        client.generate_content('prompt')
+    assert time.monotonic() - started < 1.0
+
+
+class TimeoutModel:
+    """Backend that enforces `timeout` itself and records the thread each call ran on."""
+
+    def __init__(self):
+        self.calls = []
+
+    def generate_content(self, prompt, timeout=None):
+        self.calls.append((timeout, threading.current_thread()))
+        return VALID
+
+
+def test_deadline_only_calls_a_timeout_aware_backend_directly():
+    model = TimeoutModel()
+    client = ResilientModel(model, hedge_policy=make_hedge_policy(deadline=30))
+
+    assert client.generate_content('prompt') is VALID
+    assert model.calls == [(30, threading.current_thread())]
+    assert client._pool is None
+
+
+def test_hedge_pool_is_sized_from_the_worker_count():
+    policy = HedgePolicy(percentile=50)
+    client = ResilientModel(TimeoutModel(), hedge_policy=policy, max_workers=100)
+    client.generate_content('prompt')
+
+    assert client._pool._max_workers == 200
+    assert ResilientModel(TimeoutModel()).pool_size == ResilientModel.HEDGE_POOL_SIZE
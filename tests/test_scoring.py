@@ -0,0 +1,120 @@
+# test_scoring.py
+import pandas as pd
+import pytest
+
+from prompts import LEVEL_INTERPRETATIONS
+from scoring import (
+    ALL_COMPETENCIES,
+    DEVELOPMENT_BANDS,
+    NO_BULLET,
+    ORDER_COLUMN,
+    PLACEHOLDER_NAME,
+    STRENGTH_BANDS,
+    add_bands,
+    band_column,
+    band_signature,
+    pronoun_set,
+    resolve_interpretations,
+    substitute_name,
+    template_summaries,
+)
+
+
+def _bullets(summary, heading):
+    section = summary.split(f"**{heading}:**\n", 1)[1].split('\n\n', 1)[0]
+    return [line[2:] for line in section.splitlines()]
+
+
+def _texts_in(level, bands):
+    rules = LEVEL_INTERPRETATIONS[level.upper()]
+    return ' '.join(text for by_band in rules.values() for band, text in by_band.items() if band in bands)
+
+
+def test_bands_follow_the_thresholds():
+    scores = pd.DataFrame({competency: [3.5, 3.49, 3.0, 2.5, 2.49, None] for competency in ALL_COMPETENCIES})
+    banded = add_bands(scores)
+
+    assert list(banded[band_column('Overall Leadership')].iloc[:5]) == [
+        'High', 'Moderate-High', 'Moderate-High', 'Moderate-Low', 'Low']
+    assert list(banded[band_column('Drives Results')].iloc[:5]) == ['High', 'Moderate', 'Moderate', 'Moderate', 'Low']
+    assert pd.isna(banded[band_column('Drives Results')].iloc[5])
+
+
+def test_competencies_are_ordered_by_descending_score(cohort):
+    order = add_bands(cohort)[ORDER_COLUMN].iloc[1]
+
+    assert order[:2] == ('Leads People', 'Manages Stakeholders')
+    assert order[-1] == 'Solves Challenges'
+
+
+def test_resolved_texts_follow_the_order(cohort):
+    row = add_bands(cohort).iloc[1]
+    _, _, level_texts = resolve_interpretations(row)
+    rules = LEVEL_INTERPRETATIONS['APPLY']
+
+    assert level_texts[0] == ('High', rules['Leads People']['High'])
+    assert level_texts[-1] == ('Low', rules['Solves Challenges']['Low'])
+
+
+@pytest.mark.parametrize('position', range(4))
+def test_template_bullets_come_from_matching_bands(cohort, position):
+    row = add_bands(cohort).iloc[position]
+    strengths_only = _texts_in(row['Level'], set(STRENGTH_BANDS) - set(DEVELOPMENT_BANDS))
+    development_only = _texts_in(row['Level'], set(DEVELOPMENT_BANDS) - set(STRENGTH_BANDS))
+
+    for summary in template_summaries(row):
+        assert not any(bullet in development_only for bullet in _bullets(summary, 'Strengths'))
+        assert not any(bullet in strengths_only for bullet in _bullets(summary, 'Development Areas'))
+
+
+def test_template_bullets_for_uniform_scores(cohort):
+    high, low = cohort.iloc[:1].copy(), cohort.iloc[:1].copy()
+    high[ALL_COMPETENCIES], low[ALL_COMPETENCIES] = 5.0, 1.0
+
+    high_summary = template_summaries(add_bands(high).iloc[0])[0]
+    low_summary = template_summaries(add_bands(low).iloc[0])[0]
+
+    assert len(_bullets(high_summary, 'Strengths')) == 2
+    assert _bullets(high_summary, 'Development Areas') == [NO_BULLET]
+    assert _bullets(low_summary, 'Strengths') == [NO_BULLET]
+    assert len(_bullets(low_summary, 'Development Areas')) == 2
+
+
+def test_band_signature_ignores_scores_within_the_same_bands(cohort):
+    twin = cohort.iloc[[0]].copy()
+    twin['Name'] = 'Twin'
+    twin['Level'] = ' shape '
+    twin['Drives Results'] += 0.01
+    banded = add_bands(pd.concat([cohort.iloc[[0]], twin], ignore_index=True))
+
+    assert band_signature(banded.iloc[0]) == band_signature(banded.iloc[1])
+
+
+def test_band_signature_separates_pronouns_and_order(cohort):
+    variants = pd.concat([cohort.iloc[[0]]] * 3, ignore_index=True)
+    variants.loc[1, 'Gender'] = 'She/Her'
+    # Swapping two High scores keeps every band but changes the competency order.
+    variants.loc[2, ['Drives Results', 'Leads People']] = [4.25, 4.48]
+    signatures = [band_signature(row) for _, row in add_bands(variants).iterrows()]
+
+    assert len(set(signatures)) == 3
+
+
+def test_pronoun_set_normalizes_gender():
+    assert pronoun_set(' she/her ') == 'SHE/HER'
+    assert pronoun_set('They/Them') == pronoun_set('') == 'THEY/THEM'
+
+
+def test_substitute_name_replaces_the_placeholder():
+    first_name = PLACEHOLDER_NAME.split()[0]
+    text = f"{PLACEHOLDER_NAME} leads well. {first_name} adapts; {first_name}ander is someone else."
+
+    assert substitute_name(text, ' Sara Khan ') == 'Sara Khan leads well. Sara adapts; Alexander is someone else.'
+
+
+def test_substitute_name_replaces_the_placeholder_surname():
+    surname = PLACEHOLDER_NAME.split()[-1]
+    text = f"{surname}'s team trusts {surname}."
+
+    assert substitute_name(text, 'Sara Al Khan') == "Khan's team trusts Khan."
+    assert substitute_name(text, 'Sara') == "Sara's team trusts Sara."
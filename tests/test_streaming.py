@@ -0,0 +1,73 @@
+# test_streaming.py
+import io
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+from streaming import dataframe_to_xlsx_bytes, file_format, open_writer, read_chunks
+
+
+def _write_xlsx(path, rows):
+    workbook = openpyxl.Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    workbook.save(path)
+
+
+def test_file_format_follows_the_extension():
+    assert file_format('cohort.CSV') == 'csv'
+    assert file_format('cohort.xlsx') == 'xlsx'
+    with pytest.raises(ValueError):
+        file_format('cohort.json')
+
+
+def test_read_chunks_splits_a_csv(tmp_path, cohort):
+    path = tmp_path / 'cohort.csv'
+    cohort.to_csv(path, index=False)
+
+    chunks = list(read_chunks(str(path), chunk_size=3))
+
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+    assert list(chunks[1].index) == [0]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), cohort)
+
+
+def test_read_chunks_splits_a_workbook_and_skips_blank_rows(tmp_path):
+    path = tmp_path / 'cohort.xlsx'
+    _write_xlsx(path, [['Name', None], ['a', 1], [None, None], ['b', 2], ['c', 3]])
+
+    chunks = list(read_chunks(str(path), chunk_size=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert list(chunks[0].columns) == ['Name', 'Unnamed: 1']
+    assert list(pd.concat(chunks)['Name']) == ['a', 'b', 'c']
+
+
+def test_read_chunks_of_an_empty_workbook_yields_nothing(tmp_path):
+    path = tmp_path / 'empty.xlsx'
+    openpyxl.Workbook().save(path)
+
+    assert list(read_chunks(str(path))) == []
+
+
+@pytest.mark.parametrize('extension', ['csv', 'xlsx'])
+def test_writers_append_chunks_under_one_header(tmp_path, cohort, extension):
+    path = str(tmp_path / f"out.{extension}")
+    with open_writer(path, cohort.columns) as writer:
+        writer.write(cohort.iloc[:2])
+        writer.write(cohort.iloc[2:])
+
+    written = pd.read_csv(path) if extension == 'csv' else pd.read_excel(path)
+    pd.testing.assert_frame_equal(written, cohort)
+
+
+def test_dataframe_to_xlsx_bytes_writes_missing_values_as_empty_cells():
+    df = pd.DataFrame({'Name': ['a', 'b'], 'Summary': ['text', np.nan]})
+
+    workbook = openpyxl.load_workbook(io.BytesIO(dataframe_to_xlsx_bytes(df, sheet_name='Results')))
+
+    assert workbook.sheetnames == ['Results']
+    assert [row for row in workbook['Results'].iter_rows(values_only=True)] == [
+        ('Name', 'Summary'), ('a', 'text'), ('b', None)]
@@ -0,0 +1,60 @@
+# test_validator.py
+import json
+
+import pytest
+
+from validator import (
+    SUMMARY_KEYS,
+    TARGET_WORDS,
+    extract_json,
+    is_hard_failure,
+    validate_summaries,
+    validate_summary,
+)
+
+
+def _summary(words):
+    bullet = '* Shows a consistent and practical approach.'
+    paragraph = ' '.join(['Candidate'] + ['word'] * (words - 25))
+    return f"{paragraph}\n\n**Strengths:**\n{bullet}\n{bullet}\n\n**Development Areas:**\n{bullet}\n{bullet}"
+
+
+@pytest.mark.parametrize('text', [
+    '{"a": 1}',
+    '```json\n{"a": 1}\n```',
+    'Here you go:\n{"a": 1}\nHope that helps.',
+])
+def test_extract_json_tolerates_fences_and_prose(text):
+    assert extract_json(text) == {'a': 1}
+
+
+def test_extract_json_reads_arrays():
+    assert extract_json('Result: [{"id": "1"}]') == [{'id': '1'}]
+
+
+def test_extract_json_rejects_text_without_json():
+    with pytest.raises(json.JSONDecodeError):
+        extract_json('no json here')
+
+
+@pytest.mark.parametrize('key', SUMMARY_KEYS)
+def test_well_formed_summary_has_no_problems(key):
+    assert validate_summary(key, _summary(TARGET_WORDS[key])) == []
+
+
+def test_length_and_bullet_problems_are_soft():
+    text = _summary(60).replace('* Shows', 'Shows', 1)
+    problems = validate_summary('summary_200', text)
+
+    assert any('words; expected about 200' in problem for problem in problems)
+    assert any("1 bullets under '**Strengths:**'" in problem for problem in problems)
+    assert not is_hard_failure(problems)
+
+
+def test_missing_variant_is_a_hard_failure():
+    problems = validate_summaries({'summary_200': _summary(200), 'summary_150': '  '})
+
+    assert problems['summary_200'] == []
+    assert is_hard_failure(problems['summary_150'])
+    assert is_hard_failure(problems['summary_100'])
+    assert all(is_hard_failure(items) for items in validate_summaries(None).values())
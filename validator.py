@@ -0,0 +1,92 @@
+# validator.py
+# Robust JSON extraction, the structured-output schema, and a fast local
+# validator for the three summary variants.
+import json
+import re
+
+SUMMARY_KEYS = ('summary_200', 'summary_150', 'summary_100')
+TARGET_WORDS = {'summary_200': 200, 'summary_150': 150, 'summary_100': 100}
+# The SME exemplars run at roughly 75% of the nominal length, so the band is generous.
+WORD_COUNT_RANGE = (0.5, 1.3)
+BULLETS_PER_SECTION = 2
+SECTION_HEADINGS = ('**Strengths:**', '**Development Areas:**')
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+_BULLET = re.compile(r"^\s*[*\-•]\s+\S", re.MULTILINE)
+
+
+def extract_json(text):
+    """Parses a JSON object/array from model output, tolerating code fences and stray prose."""
+    cleaned = _FENCE.sub('', text.strip())
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        starts = [index for index in (cleaned.find('{'), cleaned.find('[')) if index >= 0]
+        if not starts:
+            raise
+        start = min(starts)
+        end = cleaned.rfind('}' if cleaned[start] == '{' else ']')
+        if end <= start:
+            raise
+        return json.loads(cleaned[start:end + 1])
+
+
+def summary_schema(keys=SUMMARY_KEYS, batch=False):
+    """Response schema for structured output: an object with `keys`, or an array of them with ids."""
+    properties = {key: {'type': 'string'} for key in keys}
+    required = list(keys)
+    if batch:
+        properties = {'id': {'type': 'string'}, **properties}
+        required = ['id'] + required
+    schema = {'type': 'object', 'properties': properties, 'required': required}
+    return {'type': 'array', 'items': schema} if batch else schema
+
+
+def structured_output_config(keys=SUMMARY_KEYS, batch=False):
+    """`generation_config` asking a Gemini backend for schema-constrained JSON."""
+    return {'response_mime_type': 'application/json', 'response_schema': summary_schema(keys, batch)}
+
+
+def word_count(text):
+    return len(re.findall(r"[\w'’-]+", text))
+
+
+def validate_summary(key, text):
+    """Returns a list of problems with one variant; empty when it looks right.
+
+    Problems starting with 'missing' are hard failures; the rest (length and
+    bullet structure) are worth one targeted regeneration.
+    """
+    if not isinstance(text, str) or not text.strip():
+        return ['missing or empty']
+    problems = []
+    body = text.split(SECTION_HEADINGS[0])[0]
+    low, high = WORD_COUNT_RANGE
+    target = TARGET_WORDS[key]
+    words = word_count(text)
+    if not low * target <= words <= high * target:
+        problems.append(f"has {words} words; expected about {target}")
+    for heading, following in zip(SECTION_HEADINGS, SECTION_HEADINGS[1:] + (None,)):
+        if heading not in text:
+            problems.append(f"lacks the '{heading}' section")
+            continue
+        section = text.split(heading, 1)[1]
+        if following is not None:
+            section = section.split(following, 1)[0]
+        bullets = len(_BULLET.findall(section))
+        if bullets != BULLETS_PER_SECTION:
+            problems.append(f"has {bullets} bullets under '{heading}'; expected {BULLETS_PER_SECTION}")
+    if not body.strip():
+        problems.append("has no summary paragraph before the bullet points")
+    return problems
+
+
+def validate_summaries(summaries, keys=SUMMARY_KEYS):
+    """Maps each key to its problems (see `validate_summary`)."""
+    if not isinstance(summaries, dict):
+        return {key: ['missing or empty'] for key in keys}
+    return {key: validate_summary(key, summaries.get(key)) for key in keys}
+
+
+def is_hard_failure(problems):
+    return any(problem.startswith('missing') for problem in problems)